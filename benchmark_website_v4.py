@@ -0,0 +1,307 @@
+"""
+=============================================================================
+ADELYN WONG WEBSITE GENERATOR v4 - BENCHMARKS
+=============================================================================
+Times parts of generate_website_v4.py without the real masterbook.
+A synthetic masterbook, watermark photos and seo.docx files are generated
+once per scale and reused.
+Run:  python benchmark_website_v4.py [--scale 100|1000|10000] [--photos 3]
+=============================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import zipfile
+
+import generate_website_v4 as gen
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def time_it(func, repeat=5, number=100):
+    """Best time per call over `repeat` rounds of `number` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def print_result(name, seconds, baseline=None):
+    line = f"   {name:<40} {seconds * 1000:9.3f} ms"
+    if baseline:
+        line += f"   ({baseline / seconds:.1f}x)"
+    print(line)
+
+
+def quietly(func, *args):
+    """Call func without its progress prints"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+FIXTURE_SCALES = [100, 1000, 10000]
+FIXTURE_LOCATIONS = ['Setia Eco Park', 'Eco Ardence', 'Setia City', 'Setia Alam', 'Bukit Jelutong', 'Klang']
+FIXTURE_TYPES = ['Semi-D', 'Bungalow', 'Terrace', 'Condo', 'Shop Lot', 'Office']
+FIXTURE_PHOTO_VARIETY = 12      # Distinct source JPEGs, copied round-robin into the watermark folders
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>')
+
+
+def write_docx(path, paragraphs):
+    """Smallest .docx that Word, python-docx and gen.read_docx_paragraphs accept"""
+    body = ''.join(f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>' for text in paragraphs)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', DOCX_CONTENT_TYPES)
+        docx.writestr('_rels/.rels', DOCX_RELS)
+        docx.writestr('word/document.xml', document)
+
+
+def make_source_photos(folder, count=FIXTURE_PHOTO_VARIETY, size=(2400, 1600)):
+    """Camera-sized JPEGs with enough detail that encoding costs what a real photo does"""
+    from PIL import Image, ImageDraw
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(0)
+    paths = []
+    for i in range(count):
+        img = Image.new('RGB', size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(150):
+            x, y = rng.randrange(size[0]), rng.randrange(size[1])
+            colour = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            draw.rectangle([x, y, x + rng.randrange(40, 400), y + rng.randrange(40, 300)], fill=colour)
+        path = os.path.join(folder, f"source-{i:02d}.jpg")
+        img.save(path, 'JPEG', quality=92)
+        paths.append(path)
+    return paths
+
+
+def make_fixture(root, listings=100, photos=3):
+    """Write masterbook.xlsx plus a property folder (watermark/ + seo.docx) per listing.
+
+    Every 10th listing is commercial, every 8th is let out and every 25th
+    sold; every 3rd is for sale. Returns the masterbook path.
+    """
+    import pandas as pd
+    rng = random.Random(listings)
+    sources = make_source_photos(os.path.join(root, '_sources'))
+    props, commercial, active = [], [], []
+    for i in range(1, listings + 1):
+        prop_id = f"PROP-{i:05d}"
+        folder = f"Listings/{prop_id}"
+        location = FIXTURE_LOCATIONS[i % len(FIXTURE_LOCATIONS)]
+        is_commercial = i % 10 == 0
+        row = {
+            'Location': location,
+            'Property type': FIXTURE_TYPES[4 + i % 2] if is_commercial else FIXTURE_TYPES[i % 4],
+            'Bedrooms': 'Studio' if i % 17 == 0 else rng.randint(1, 6),
+            'Bathrooms': rng.randint(1, 6),
+            'Built-up': rng.randrange(600, 5000, 10),
+            'Rental price': rng.randrange(1200, 12000, 100),
+            'Selling price': rng.randrange(300000, 3000000, 1000),
+            'Furnishing': rng.choice(['Fully Furnished', 'Partly Furnished', 'Unfurnished']),
+            'Tenure': rng.choice(['Freehold', 'Leasehold']),
+            '3D_link': f"https://my.matterport.com/show/?m={prop_id}" if i % 5 == 0 else None,
+            'property_folder': folder,
+        }
+        if is_commercial:
+            commercial.append(dict(row, Commercial_ID=prop_id))
+        else:
+            props.append(dict(row, Property_ID=prop_id))
+        status = 'Sold' if i % 25 == 0 else 'Let Out' if i % 8 == 0 else 'In Listing'
+        active.append({
+            'Property_ID': prop_id,
+            'Category': 'Commercial' if is_commercial else 'Residential',
+            'Listing_Type': 'Sale' if i % 3 == 0 else 'Rent',
+            'Ads_Status': status,
+            'Rent_RM': None,
+            'Sale_RM': None,
+        })
+        
+        watermark = os.path.join(root, folder, 'watermark')
+        os.makedirs(watermark, exist_ok=True)
+        for j in range(photos):
+            shutil.copyfile(sources[(i + j) % len(sources)], os.path.join(watermark, f"photo-{j + 1:02d}.jpg"))
+        if i % 4:
+            write_docx(os.path.join(root, folder, 'seo.docx'), [
+                f"Well kept {row['Property type'].lower()} in {location}, close to schools and shops.",
+                "Renovated kitchen, built-in wardrobes and covered parking for two cars.",
+                "Viewing by appointment.",
+            ])
+    
+    masterbook = os.path.join(root, 'masterbook.xlsx')
+    with pd.ExcelWriter(masterbook) as writer:
+        pd.DataFrame(props).to_excel(writer, sheet_name='Properties', index=False)
+        pd.DataFrame(active).to_excel(writer, sheet_name='Active Listing', index=False)
+        pd.DataFrame(commercial).to_excel(writer, sheet_name='Commercial_Properties', index=False)
+    return masterbook
+
+
+def use_fixture(root, listings, photos):
+    """Point the generator at a fixture, building it first if needed. Returns the output folder."""
+    marker = os.path.join(root, 'fixture.json')
+    spec = {'listings': listings, 'photos': photos}
+    if not os.path.exists(marker) or json.load(open(marker)) != spec:
+        print(f"\n🏗️ Building fixture: {listings} listings x {photos} photos in {root}")
+        shutil.rmtree(root, ignore_errors=True)
+        start = time.perf_counter()
+        make_fixture(root, listings, photos)
+        with open(marker, 'w') as f:
+            json.dump(spec, f)
+        print(f"   ✅ {time.perf_counter() - start:.1f}s")
+    gen.MASTERBOOK_PATH = os.path.join(root, 'masterbook.xlsx')
+    gen.PHOTO_BASE_PATH = root
+    gen.OUTPUT_FOLDER = os.path.join(root, 'output')
+    return gen.OUTPUT_FOLDER
+
+
+# =============================================================================
+# TEMPLATE RENDERING
+# =============================================================================
+
+def get_sample_detail_values():
+    gallery = ''.join(
+        f'<img src="photos/PROP-00001/photo-{i:02d}-tile.jpg" alt="Setia Eco Park" onclick="openLightbox({i})" loading="lazy">'
+        for i in range(15)
+    )
+    return {
+        'property_title': "Semi-D at Setia Eco Park",
+        'meta_description': "Semi-D for rent in Setia Eco Park. 5 bedrooms, 6 bathrooms, 3,200 sqft.",
+        'hero_image': '<img src="photos/PROP-00001/photo-01.jpg" alt="Semi-D at Setia Eco Park">',
+        'side_image_1': '<img src="photos/PROP-00001/photo-02.jpg" alt="Semi-D at Setia Eco Park">',
+        'side_image_2': '<img src="photos/PROP-00001/photo-03.jpg" alt="Semi-D at Setia Eco Park">',
+        'more_photos': 12,
+        'property_type': "Semi-D",
+        'location': "Setia Eco Park",
+        'beds': "5",
+        'baths': "6",
+        'sqft': "3,200",
+        'price': "RM 6,500",
+        'price_label': "per month",
+        'badge_class': "badge-rent",
+        'listing_type': "For Rent",
+        'whatsapp_link': f"https://wa.me/{gen.WHATSAPP}?text=Hi%20Adelyn",
+        'tour_button': '',
+        'video_button': '',
+        'description': "Spacious corner unit facing the lake.\n\n" * 20,
+        'furnishing': "Fully Furnished",
+        'tenure': "Freehold",
+        'tour_section': '',
+        'gallery_images': gallery,
+        'photos_json': ", ".join(f'"photos/PROP-00001/photo-{i:02d}.jpg"' for i in range(15)),
+    }
+
+
+def render_with_replace(values):
+    """The previous renderer: rebuild the template, then one replace per placeholder"""
+    html = gen.get_detail_template()
+    for name, value in values.items():
+        html = html.replace('{' + name + '}', str(value))
+    return html
+
+
+def benchmark_templates():
+    print("\n📝 Detail page template")
+    values = get_sample_detail_values()
+    compiled = gen.get_compiled_template('detail')
+
+    replace_time = time_it(lambda: render_with_replace(values))
+    compiled_time = time_it(lambda: compiled.render(values))
+    print_result("replace chain", replace_time)
+    print_result("compiled template", compiled_time, replace_time)
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def benchmark_photo(root):
+    print("\n📷 compress_and_copy_photo")
+    src = os.path.join(root, '_sources', 'source-00.jpg')
+    dst = os.path.join(tempfile.mkdtemp(), 'photo.jpg')
+    print_result("2400x1600 JPEG", time_it(lambda: gen.compress_and_copy_photo(src, dst), repeat=3, number=3))
+
+
+def benchmark_pages(output_folder):
+    """Card and detail page rendering for one listing, with photos already encoded"""
+    gen.load_pandas()
+    data = quietly(gen.load_listings, output_folder)
+    listing = data['available'][0]
+    photos = quietly(gen.process_photos, [listing], output_folder)[listing.prop_id]
+    description = gen.read_seo_docx(listing.property_folder)
+    
+    print(f"\n🃏 Pages ({listing.prop_id}, {len(photos)} photos)")
+    print_result("generate_property_card", time_it(lambda: gen.generate_property_card(listing, output_folder, photos)))
+    print_result("generate_detail_page", time_it(
+        lambda: gen.generate_detail_page(listing, output_folder, photos, description), number=20))
+    print_result("read_seo_docx", time_it(lambda: gen.read_seo_docx(listing.property_folder), number=20))
+
+
+def benchmark_build(output_folder):
+    """build_website from an empty output folder, then again with every cache warm"""
+    print("\n🌐 Full build")
+    shutil.rmtree(output_folder, ignore_errors=True)
+    gen.load_pandas()
+    for name in ("cold (empty output)", "warm (nothing changed)"):
+        start = time.perf_counter()
+        quietly(gen.build_website, output_folder)
+        print_result(name, time.perf_counter() - start)
+        report = gen.load_cache_file(output_folder, gen.BUILD_REPORT_FILE)
+        for stage in report.get('stages', []):
+            print(f"      {stage['name']:<37} {stage['seconds'] * 1000:9.1f} ms")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generate_website_v4.py on synthetic data")
+    parser.add_argument('--scale', type=int, choices=FIXTURE_SCALES, default=FIXTURE_SCALES[0], help="number of listings")
+    parser.add_argument('--photos', type=int, default=3, help="photos per listing")
+    parser.add_argument('--fixture', help="fixture folder (default: a folder in the temp dir, reused between runs)")
+    parser.add_argument('--skip-build', action='store_true', help="skip the full generate_website benchmark")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("WEBSITE GENERATOR v4 BENCHMARKS")
+    print("=" * 60)
+    root = args.fixture or os.path.join(tempfile.gettempdir(), f"website_v4_fixture_{args.scale}")
+    output_folder = use_fixture(root, args.scale, args.photos)
+    benchmark_templates()
+    benchmark_photo(root)
+    benchmark_pages(output_folder)
+    if not args.skip_build:
+        benchmark_build(output_folder)
@@ -10,33 +10,85 @@ Reads from:
 =============================================================================
 """
 
-import pandas as pd
 import os
-import shutil
+import base64
+import io
+import sys
+import json
+import hashlib
+import gzip
+import zipfile
+import argparse
+import threading
+import time
+import importlib.util
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from contextlib import contextmanager
 import re
 
-# Try to import python-docx for reading Word files
-try:
-    from docx import Document
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-    print("⚠️ python-docx not installed. Run: pip install python-docx")
-
-# Try to import Pillow for image compression
-try:
-    from PIL import Image
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
+# pandas, Pillow and python-docx are slow to import, so they are only checked
+# for here and imported by load_pandas()/load_pil()/load_docx() when a stage needs them
+pd = None
+Image = ImageOps = None
+Document = None
+
+# python-docx is only a fallback for seo.docx files the built-in reader cannot parse
+HAS_DOCX = importlib.util.find_spec('docx') is not None
+
+# Pillow for image compression
+HAS_PIL = importlib.util.find_spec('PIL') is not None
+if not HAS_PIL:
     print("⚠️ Pillow not installed. Run: pip install Pillow")
 
+# Brotli is optional; without it only .gz siblings are written
+HAS_BROTLI = importlib.util.find_spec('brotli') is not None
+
+# watchdog is optional; --watch falls back to polling without it
+HAS_WATCHDOG = importlib.util.find_spec('watchdog') is not None
+
 # Compression settings
 COMPRESS_PHOTOS = True          # Set to False to disable compression
 MAX_PHOTO_WIDTH = 1920          # Max width in pixels
 MAX_PHOTO_HEIGHT = 1080         # Max height in pixels
 JPEG_QUALITY = 80               # Quality 1-100 (80 is good balance)
+JPEG_QUALITY_MODE = 'fixed'     # 'ssim' = per photo, the lowest quality that keeps SSIM >= SSIM_TARGET
+SSIM_TARGET = 0.95              # ('ssim' mode also writes progressive JPEGs without EXIF/XMP)
+JPEG_QUALITY_RANGE = (40, 90)   # Qualities searched in 'ssim' mode
+PHOTO_WORKERS = 0               # Worker processes for photos (0 = all CPU cores, 1 = no pool)
+
+# Responsive images (smaller widths + modern formats, JPEG stays the fallback)
+RESPONSIVE_IMAGES = True
+RESPONSIVE_WIDTHS = [400, 800, 1200, 1920]
+RESPONSIVE_FORMATS = ['avif', 'webp']   # AVIF is skipped if this Pillow cannot write it
+WEBP_QUALITY = 78
+AVIF_QUALITY = 55
+AVIF_SPEED = 8                  # 0 (smallest, slowest) to 10 (fastest)
+CARD_IMAGE_SIZES = "(max-width: 768px) 100vw, 400px"
+HERO_IMAGE_SIZES = "(max-width: 768px) 100vw, 800px"
+SIDE_IMAGE_SIZES = "(max-width: 768px) 50vw, 400px"
+GALLERY_IMAGE_SIZES = "(max-width: 768px) 50vw, 300px"
+
+# Placeholder painted behind each photo until it loads (the <img> also gets width/height)
+PHOTO_PLACEHOLDER = 'blur'      # 'blur' = tiny inline JPEG behind detail hero photos, average colour
+                                # elsewhere (keeps index.html small); 'color' = colour only; '' = none
+PLACEHOLDER_SIZE = 16           # Longest side of the inline JPEG in pixels
+
+# Content-addressed photos: every listing references photos/_store/<hash>.jpg, so the
+# same source photo (relisted unit, shared development shots) is encoded and uploaded once
+PHOTO_STORE = False
+PHOTO_STORE_FOLDER = "_store"
+PHOTO_DUPLICATE_REPORT = False  # Also list visually near-identical photos (perceptual hash)
+PHOTO_DUPLICATE_DISTANCE = 4    # Max differing bits out of 64 to count as a near-duplicate
+
+# Cropped thumbnails at the size their slot renders (2x for high-DPI screens).
+# Independent of RESPONSIVE_IMAGES (without it they are JPEG only); {} = full photos in cards
+THUMBNAIL_SIZES = {
+    'card': (640, 400),   # .property-image carousel (~320-400 x 200px)
+    'tile': (600, 400),   # .gallery-grid tiles (~200-300 x 200px)
+}
 
 # =============================================================================
 # CONFIGURATION
@@ -48,38 +100,202 @@ OUTPUT_FOLDER = r"E:\phython_automation_github"
 MAX_PHOTOS_PER_PROPERTY = 10
 MAX_PHOTOS_DETAIL_PAGE = 15  # Reduced to save storage
 
+# Main page: 'full' renders every card; 'virtual' renders the first
+# INDEX_INITIAL_CARDS and loads the rest from listings.json while scrolling
+INDEX_MODE = 'full'
+INDEX_INITIAL_CARDS = 12
+LISTINGS_FEED_FILE = "listings.json"
+
+# Pre-rendered filter pages (rent/index.html, rent/page-2.html, ...)
+FILTER_PAGE_SIZE = 24
+FILTER_TABS = [
+    ('rent', 'For Rent'),
+    ('sale', 'For Sale'),
+    ('setia-eco-park', 'Setia Eco Park'),
+    ('eco-ardence', 'Eco Ardence'),
+    ('setia-city', 'Setia City'),
+    ('other', 'Other Areas'),
+]
+
+# Masterbook reading
+MASTERBOOK_ENGINE = None        # None = 'calamine' if python-calamine is installed, else 'openpyxl'
+MASTERBOOK_CACHE = True         # Reuse parsed sheets while the workbook is unchanged
+MASTERBOOK_SHEETS = ['Properties', 'Active Listing', 'Commercial_Properties']
+
+# Build cache (kept inside OUTPUT_FOLDER, ignored by git)
+BUILD_CACHE_FOLDER = ".build_cache"
+PHOTO_CACHE_FILE = "photo_cache.json"
+SOURCE_HASH_CACHE_FILE = "source_hashes.json"
+PHOTO_DUPLICATES_FILE = "photo_duplicates.json"
+SEO_CACHE_FILE = "seo_cache.json"
+SITE_IMAGES_CACHE_FILE = "site_images.json"
+BUILD_MANIFEST_FILE = "build_manifest.json"
+MASTERBOOK_CACHE_FOLDER = "masterbook"
+TEMPLATE_VERSION = 1            # Bump when page-generation code changes the HTML
+
+# Precompressed .br/.gz copies of every generated text file, for hosts that serve them directly
+# (off by default: GitHub Pages ignores them and they would only add files to the repo)
+PRECOMPRESS_OUTPUT = False
+PRECOMPRESS_MIN_SIZE = 256      # Smaller files are not worth a compressed copy
+PRECOMPRESS_WORKERS = 0         # Threads (0 = all CPU cores)
+PRECOMPRESS_CACHE_FILE = "precompress.json"
+
+# Minify pages and their inline/shared CSS and JS (description text is left as-is)
+MINIFY_HTML = False
+MINIFY_REPORT_FILE = "minify_report.json"
+
+# Per-stage and per-listing timings of the last build (and --profile output), in BUILD_CACHE_FOLDER
+BUILD_REPORT_FILE = "build_report.json"
+PROFILE_FILE = "build_profile.prof"
+
+# After a full build, outputs the build did not produce are listed (and deleted with --sweep)
+SWEEP_REPORT_FILE = "sweep_report.json"
+
+# Hashes of every output after the last full build, and what changed since the build before
+# (the upload step only needs to push the delta)
+DEPLOY_MANIFEST_FILE = "deploy_manifest.json"
+DEPLOY_DELTA_FILE = "deploy_delta.json"
+
+# --watch: seconds between source polls, and how long sources must stay unchanged before rebuilding
+WATCH_INTERVAL = 2
+WATCH_DEBOUNCE = 0.5
+
 # Contact details
 WHATSAPP = "60176846282"
 WECHAT_ID = "adelynwong80"
 EMAIL = "adelynwonglive@gmail.com"
 
+# Shared CSS/JS are written once as content-hashed files (e.g. assets/site.3f9a1c2b4d.css)
+ASSETS_FOLDER = "assets"
+ASSET_HASH_LENGTH = 10
+
+# Site images are resized to the widths they display at and written to ASSETS_FOLDER as
+# content-hashed WebP + JPEG (PNG instead of JPEG if the image has transparency)
+SITE_IMAGES_FOLDER = None       # None = OUTPUT_FOLDER (hero-banner.png lives in the site root)
+SITE_IMAGES = {
+    'hero-banner.png': [768, 1280, 1920],   # source file: display widths in pixels
+}
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
-def read_seo_docx(property_folder):
-    """Read SEO description from seo.docx in property folder"""
+def load_pandas():
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+def load_pil():
+    global Image, ImageOps
+    if Image is None:
+        from PIL import Image, ImageOps
+
+
+def load_docx():
+    global Document
+    if Document is None:
+        from docx import Document
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+WORD_SKIP_TAGS = {
+    WORD_NS + 'txbxContent',                                                   # text boxes
+    '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback',   # duplicate of the drawing
+}
+
+
+def read_docx_paragraphs(path):
+    """Text of the body paragraphs in a .docx, streamed out of word/document.xml.
+
+    Gives the same text as python-docx's doc.paragraphs (tables, text boxes
+    and content controls are not body paragraphs) without building the tree.
+    """
+    paragraphs = []
+    parts = None
+    depth = 0       # w:document = 1, w:body = 2, body paragraphs = 3
+    skip = 0
+    with zipfile.ZipFile(path) as docx, docx.open('word/document.xml') as xml_file:
+        for event, elem in ElementTree.iterparse(xml_file, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                depth += 1
+                if tag in WORD_SKIP_TAGS:
+                    skip += 1
+                elif depth == 3 and tag == WORD_NS + 'p':
+                    parts = []
+                continue
+            
+            if tag in WORD_SKIP_TAGS:
+                skip -= 1
+            elif parts is not None and not skip:
+                if tag == WORD_NS + 't':
+                    parts.append(elem.text or '')
+                elif tag in (WORD_NS + 'tab', WORD_NS + 'ptab'):
+                    parts.append('\t')
+                elif tag == WORD_NS + 'cr':
+                    parts.append('\n')
+                elif tag == WORD_NS + 'br' and elem.get(WORD_NS + 'type', 'textWrapping') == 'textWrapping':
+                    parts.append('\n')
+                elif tag == WORD_NS + 'noBreakHyphen':
+                    parts.append('-')
+            if depth == 3:
+                if parts is not None:
+                    paragraphs.append(''.join(parts))
+                    parts = None
+                elem.clear()
+            depth -= 1
+    return paragraphs
+
+
+def get_seo_path(property_folder):
+    """Path of seo.docx in the property folder, or '' if there is no folder"""
     if not property_folder or pd.isna(property_folder):
         return ""
-    
-    if not HAS_DOCX:
+    return os.path.join(PHOTO_BASE_PATH, str(property_folder), 'seo.docx')
+
+
+def read_seo_docx(property_folder):
+    """Read SEO description from seo.docx in property folder"""
+    seo_path = get_seo_path(property_folder)
+    return get_seo_text(seo_path, get_file_signature(seo_path) if seo_path else None)
+
+
+def get_seo_text(seo_path, signature, cache=None):
+    """Cleaned paragraph text of seo.docx, or "" if missing/unreadable.
+
+    signature is the [size, mtime] the caller already took. With a cache
+    dict ({path: {'signature', 'text'}}) an unchanged document is not parsed again.
+    """
+    if signature is None:
         return ""
     
-    seo_path = os.path.join(PHOTO_BASE_PATH, str(property_folder), 'seo.docx')
-    
-    if not os.path.exists(seo_path):
-        return ""
+    entry = cache.get(seo_path) if cache is not None else None
+    if entry and entry.get('signature') == signature:
+        return entry['text']
     
     try:
-        doc = Document(seo_path)
-        paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-        return '\n\n'.join(paragraphs)
+        paragraphs = read_docx_paragraphs(seo_path)
     except Exception as e:
-        print(f"   ⚠️ Could not read seo.docx: {e}")
-        return ""
-
-
-def get_shared_styles():
+        if not HAS_DOCX:
+            print(f"   ⚠️ Could not read seo.docx: {e}")
+            return ""
+        try:
+            load_docx()
+            paragraphs = [p.text for p in Document(seo_path).paragraphs]
+        except Exception as e:
+            print(f"   ⚠️ Could not read seo.docx: {e}")
+            return ""
+    text = '\n\n'.join(p.strip() for p in paragraphs if p.strip())
+    if cache is not None:
+        cache[seo_path] = {'signature': signature, 'text': text}
+    return text
+
+
+def get_critical_styles():
+    """Styles inlined in every page so the navbar paints before site.css loads"""
     return '''
         :root {
             --primary-dark: #1a1a1a;
@@ -97,6 +313,7 @@ def get_shared_styles():
             --transition: all 0.3s ease;
         }
         * { margin: 0; padding: 0; box-sizing: border-box; }
+        picture { display: contents; }
         body { font-family: var(--font-body); color: var(--text-dark); line-height: 1.6; background: var(--bg-white); }
 
         .navbar { position: fixed; top: 0; left: 0; right: 0; z-index: 1000; background: rgba(255,255,255,0.98); backdrop-filter: blur(10px); box-shadow: 0 1px 0 rgba(0,0,0,0.05); }
@@ -108,6 +325,15 @@ def get_shared_styles():
         .nav-links a:hover { color: var(--primary-gold); }
         .mobile-toggle { display: none; background: none; border: none; font-size: 1.5rem; cursor: pointer; }
 
+        @media (max-width: 768px) {
+            .nav-links { display: none; }
+            .mobile-toggle { display: block; }
+        }
+    '''
+
+
+def get_shared_styles():
+    return '''
         .footer { background: var(--primary-dark); color: rgba(255,255,255,0.7); padding: 3rem 2rem; text-align: center; }
         .footer-logo { font-family: var(--font-display); font-size: 1.5rem; color: white; margin-bottom: 1rem; }
         .footer-logo span { color: var(--primary-gold); }
@@ -116,12 +342,7 @@ def get_shared_styles():
 
         .whatsapp-float { position: fixed; bottom: 20px; right: 20px; width: 60px; height: 60px; background: var(--green-whatsapp); border-radius: 50%; display: flex; align-items: center; justify-content: center; box-shadow: 0 4px 20px rgba(37, 211, 102, 0.4); z-index: 999; transition: var(--transition); text-decoration: none; }
         .whatsapp-float:hover { transform: scale(1.1); }
-        .whatsapp-float svg { width: 32px; height: 32px; fill: white; }
-
-        @media (max-width: 768px) {
-            .nav-links { display: none; }
-            .mobile-toggle { display: block; }
-        }
+        .whatsapp-float img { width: 32px; height: 32px; }
     '''
 
 
@@ -164,47 +385,575 @@ def format_price(price, listing_type):
         return f"RM {price:,}/month"
 
 
-def compress_and_copy_photo(src_path, dst_path):
+# =============================================================================
+# BUILD CACHE
+# =============================================================================
+
+def load_cache_file(output_folder, file_name):
+    """Load a JSON file from BUILD_CACHE_FOLDER, or {} if missing/corrupt"""
+    cache_path = os.path.join(output_folder, BUILD_CACHE_FOLDER, file_name)
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"   ⚠️ Ignoring unreadable {file_name}: {e}")
+        return {}
+
+
+def save_cache_file(output_folder, file_name, data):
+    cache_folder = os.path.join(output_folder, BUILD_CACHE_FOLDER)
+    os.makedirs(cache_folder, exist_ok=True)
+    cache_path = os.path.join(cache_folder, file_name)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def get_file_signature(path):
+    """[size, mtime] of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_if_changed(path, data):
+    """Write str/bytes to path unless the file already holds exactly that.
+
+    Unchanged files keep their mtime, so uploads and the deploy manifest
+    only see real changes. Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def get_detail_fingerprint(listing, photos, seo_signature):
+    """Hash of everything a detail page is rendered from.
+
+    Covers the normalized listing fields, the seo.docx signature, the photo
+    records, the template text and the settings that are written into the page.
+    """
+    inputs = {
+        'listing': listing.to_dict(),
+        'seo': seo_signature,
+        'photos': photos[:MAX_PHOTOS_DETAIL_PAGE],
+        'template': [TEMPLATE_VERSION, get_compiled_template('detail').digest],
+        'settings': [WHATSAPP, HERO_IMAGE_SIZES, SIDE_IMAGE_SIZES, GALLERY_IMAGE_SIZES, MINIFY_HTML,
+                     PHOTO_PLACEHOLDER],
+    }
+    data = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+# =============================================================================
+# MASTERBOOK
+# =============================================================================
+
+def get_masterbook_engine():
+    if MASTERBOOK_ENGINE:
+        return MASTERBOOK_ENGINE
+    if importlib.util.find_spec('python_calamine'):
+        return 'calamine'
+    return 'openpyxl'
+
+
+def save_sheet_cache(df, base_path):
+    """Save a parsed sheet as Parquet (needs pyarrow), else as a pickle.
+
+    Each is written to a .tmp file and moved into place, so a failed write
+    never leaves a truncated cache file behind.
+    """
+    tmp_path = base_path + '.parquet.tmp'
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, base_path + '.parquet')
+        return os.path.basename(base_path) + '.parquet'
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    tmp_path = base_path + '.pkl.tmp'
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, base_path + '.pkl')
+    return os.path.basename(base_path) + '.pkl'
+
+
+def load_sheet_cache(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def read_masterbook(output_folder):
+    """Read MASTERBOOK_SHEETS with one workbook open.
+
+    Sheets missing from the workbook are left out of the result. Parsed
+    sheets are cached under BUILD_CACHE_FOLDER, keyed by the workbook's size
+    and mtime, so an unchanged masterbook is never parsed twice.
+    Returns ({sheet name: DataFrame}, from_cache).
+    """
+    load_pandas()
+    signature = get_file_signature(MASTERBOOK_PATH)
+    cache_folder = os.path.join(output_folder, BUILD_CACHE_FOLDER, MASTERBOOK_CACHE_FOLDER)
+    meta_file = os.path.join(MASTERBOOK_CACHE_FOLDER, 'meta.json')
+    
+    if MASTERBOOK_CACHE:
+        meta = load_cache_file(output_folder, meta_file)
+        if meta.get('signature') == signature and meta.get('sheets_requested') == MASTERBOOK_SHEETS:
+            try:
+                sheets = {name: load_sheet_cache(os.path.join(cache_folder, file_name))
+                          for name, file_name in meta['sheets'].items()}
+                return sheets, True
+            except Exception as e:
+                print(f"   ⚠️ Ignoring unreadable masterbook cache: {e}")
+    
+    sheets = {}
+    with pd.ExcelFile(MASTERBOOK_PATH, engine=get_masterbook_engine()) as workbook:
+        for name in MASTERBOOK_SHEETS:
+            if name in workbook.sheet_names:
+                sheets[name] = workbook.parse(name)
+    
+    if MASTERBOOK_CACHE:
+        os.makedirs(cache_folder, exist_ok=True)
+        files = {}
+        for i, (name, df) in enumerate(sheets.items()):
+            files[name] = save_sheet_cache(df, os.path.join(cache_folder, f"sheet{i}"))
+        save_cache_file(output_folder, meta_file, {
+            'signature': signature,
+            'sheets_requested': MASTERBOOK_SHEETS,
+            'sheets': files,
+        })
+    
+    return sheets, False
+
+
+# =============================================================================
+# LISTINGS
+# =============================================================================
+
+class Listing:
+    """One listing with its display fields, normalized once for card and detail page"""
+    __slots__ = (
+        'prop_id', 'location', 'location_filter', 'property_type', 'listing_type',
+        'is_sale', 'price', 'beds', 'baths', 'sqft', 'status', 'furnishing',
+        'tenure', 'tour_link', 'video_link', 'property_folder',
+    )
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+    
+    @property
+    def is_closed(self):
+        return self.status != 'available'
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def get_column(df, name, default):
+    """df[name], or a column of default if the sheet has no such column"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def to_text(series, default):
+    """Column as str, with NaN replaced by default"""
+    return series.astype(object).where(series.notna(), default).map(str)
+
+
+def to_number(series):
+    """Column as float, with '1,200'-style strings parsed and junk as NaN"""
+    return pd.to_numeric(series.astype(object).map(lambda v: v.replace(',', '') if isinstance(v, str) else v),
+                         errors='coerce')
+
+
+def normalize_listings(df):
+    """Turn merged masterbook rows into Listing records, column by column"""
+    if df.empty:
+        return []
+    
+    location = to_text(get_column(df, 'Location', 'Unknown Location'), 'nan')
+    property_type = to_text(get_column(df, 'Property type', 'Property'), 'nan')
+    listing_type = to_text(get_column(df, 'Listing_Type', 'Rent'), 'Rent')
+    
+    rent_rm = get_column(df, 'Rent_RM', 0)
+    sale_rm = get_column(df, 'Sale_RM', 0)
+    rent = to_number(rent_rm.where(rent_rm.notna(), get_column(df, 'Rental price', 0)))
+    sale = to_number(sale_rm.where(sale_rm.notna(), get_column(df, 'Selling price', 0)))
+    is_sale = (listing_type == 'Sale') & (sale > 0)
+    price = sale.where(is_sale, rent)
+    price = price.astype(object).where(price > 0, None)
+    
+    beds_text = to_text(get_column(df, 'Bedrooms', 0), '0')
+    beds_num = to_number(beds_text)
+    beds = beds_num.map(lambda v: str(int(v)) if pd.notna(v) else None)
+    beds = beds.where(beds_num.notna(), beds_text)
+    beds = beds.where(beds_text.str.lower() != 'studio', 'Studio')
+    
+    baths_num = to_number(get_column(df, 'Bathrooms', 0))
+    baths = baths_num.map(lambda v: str(int(v)) if pd.notna(v) and v >= 0 else '0')
+    
+    sqft_num = to_number(get_column(df, 'Built-up', 0))
+    sqft = sqft_num.map(lambda v: f"{int(v):,}" if pd.notna(v) and v > 0 else "N/A")
+    
+    ads_status = to_text(get_column(df, 'Ads_Status', 'In Listing'), '').str.lower()
+    status = pd.Series('available', index=df.index, dtype=object)
+    status = status.where(~ads_status.str.contains('sold', regex=False), 'sold')
+    status = status.where(~ads_status.str.contains('let out', regex=False), 'let out')
+    
+    def link_column(name):
+        text = to_text(get_column(df, name, ''), '')
+        return text.where(text.str.strip() != '', '')
+    
+    columns = {
+        'prop_id': to_text(get_column(df, 'Property_ID', ''), ''),
+        'location': location,
+        'location_filter': location.map(get_location_filter),
+        'property_type': property_type,
+        'listing_type': listing_type,
+        'is_sale': is_sale,
+        'price': price,
+        'beds': beds,
+        'baths': baths,
+        'sqft': sqft,
+        'status': status,
+        'furnishing': to_text(get_column(df, 'Furnishing', 'N/A'), 'N/A'),
+        'tenure': to_text(get_column(df, 'Tenure', 'N/A'), 'N/A'),
+        'tour_link': link_column('3D_link'),
+        'video_link': link_column('Video_Link'),
+        'property_folder': to_text(get_column(df, 'property_folder', ''), ''),
+    }
+    names = list(columns)
+    return [Listing(**dict(zip(names, values)))
+            for values in zip(*(columns[name].tolist() for name in names))]
+
+
+# =============================================================================
+# PHOTO PIPELINE
+# =============================================================================
+
+def prepare_photo(img, settings):
+    """Convert to a web-safe mode and shrink to the max dimensions"""
+    # Convert to RGB if necessary (for PNG with transparency)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    
+    # Resize if larger than max dimensions
+    img.thumbnail((settings['max_width'], settings['max_height']), Image.LANCZOS)
+    
+    if settings.get('quality_mode') == 'ssim':
+        # Camera/editor metadata is not needed on the web (the ICC profile stays for colour)
+        img.info = {key: value for key, value in img.info.items() if key == 'icc_profile'}
+    return img
+
+
+def get_ssim(a, b):
+    """Mean SSIM of two equal-size greyscale arrays, over 8x8 windows"""
+    import numpy as np
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    window = min(8, *a.shape)
+    
+    def local_mean(x):
+        # Box filter from a summed-area table ("valid" windows only)
+        table = np.pad(x.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        return (table[window:, window:] - table[:-window, window:] - table[window:, :-window]
+                + table[:-window, :-window]) / (window * window)
+    
+    mu_a, mu_b = local_mean(a), local_mean(b)
+    var_a = local_mean(a * a) - mu_a * mu_a
+    var_b = local_mean(b * b) - mu_b * mu_b
+    covar = local_mean(a * b) - mu_a * mu_b
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * covar + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+
+def find_jpeg_quality(img, settings):
+    """Lowest quality in settings['quality_range'] whose JPEG keeps SSIM >= settings['ssim_target'].
+
+    Binary search on the luma channel of the already resized image.
+    """
+    import numpy as np
+    reference = np.asarray(img.convert('L'), dtype=np.float64)
+    low, high = settings['quality_range']
+    best = high
+    while low <= high:
+        quality = (low + high) // 2
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality)
+        buffer.seek(0)
+        with Image.open(buffer) as encoded:
+            decoded = np.asarray(encoded.convert('L'), dtype=np.float64)
+        if get_ssim(reference, decoded) >= settings['ssim_target']:
+            best, high = quality, quality - 1
+        else:
+            low = quality + 1
+    return best
+
+
+def compress_and_copy_photo(src_path, dst_path, settings=None):
     """Compress photo and save to destination"""
-    if not HAS_PIL or not COMPRESS_PHOTOS:
+    settings = settings or get_photo_settings()
+    
+    if not HAS_PIL or not settings['compress']:
         # Just copy if Pillow not available or compression disabled
-        shutil.copy2(src_path, dst_path)
+        copy_photo(src_path, dst_path)
         return
     
-    try:
+    # A photo that cannot be decoded raises: copying it out would publish a broken file
+    load_pil()
+    with Image.open(src_path) as img:
+        img = prepare_photo(img, settings)
+        if settings.get('quality_mode') == 'ssim':
+            settings = dict(settings, jpeg_quality=find_jpeg_quality(img, settings))
+        
+        # Save as JPEG with compression
+        dst_path_jpg = dst_path.rsplit('.', 1)[0] + '.jpg'
+        save_photo_variant(img, dst_path_jpg, 'jpg', settings)
+        
+        return dst_path_jpg
+
+
+def save_photo_variant(img, path, fmt, settings):
+    """Encode img in memory and write it only if the bytes differ from the file on disk"""
+    write_if_changed(path, encode_image(img, fmt, settings))
+
+
+def encode_image(img, fmt, settings):
+    """Bytes of img in fmt ('jpg', 'webp', 'avif' or 'png') at the qualities in settings"""
+    buffer = io.BytesIO()
+    # Pillow only writes the colour profile when it is passed explicitly
+    icc = {'icc_profile': img.info['icc_profile']} if img.info.get('icc_profile') else {}
+    if fmt == 'png':
+        img.save(buffer, 'PNG', optimize=True, **icc)
+    elif fmt == 'jpg':
+        img.save(buffer, 'JPEG', quality=settings['jpeg_quality'], optimize=True,
+                 progressive=settings.get('quality_mode') == 'ssim', **icc)
+    elif fmt == 'webp':
+        img.save(buffer, 'WEBP', quality=settings['webp_quality'], **icc)
+    elif fmt == 'avif':
+        img.save(buffer, 'AVIF', quality=settings['avif_quality'], speed=settings['avif_speed'], **icc)
+    return buffer.getvalue()
+
+
+def copy_photo(src_path, dst_path):
+    """Uncompressed fallback: copy the source if the destination differs"""
+    with open(src_path, 'rb') as f:
+        write_if_changed(dst_path, f.read())
+
+
+def encode_photo(src_path, dst_path, settings=None):
+    """Encode one photo: the main JPEG plus its responsive variants.
+
+    The main JPEG (dst_path) is the largest fallback. Smaller widths and the
+    modern formats are written next to it as name-800w.webp, name.avif etc.
+    Cropped thumbnails (THUMBNAIL_SIZES) are written as name-card.jpg etc.
+    Returns a photo record:
+        {'name': 'x.jpg', 'width': 1920, 'height': 1080,
+         'variants': {'jpg': [[800, 'x-800w.jpg'], [1920, 'x.jpg']], 'webp': [...]},
+         'thumbs': {'card': {'width': 640, 'height': 400, 'jpg': 'x-card.jpg', 'webp': ...}},
+         'files': {'x.jpg': 123456, ...},
+         'color': '#8a7f70', 'blur': 'data:image/jpeg;base64,...'}
+    """
+    settings = settings or get_photo_settings()
+    dest_folder, name = os.path.split(dst_path)
+    base = name.rsplit('.', 1)[0]
+    record = {'name': name, 'width': None, 'height': None, 'variants': {}, 'thumbs': {}, 'files': {}}
+    
+    if not HAS_PIL or not settings['compress']:
+        compress_and_copy_photo(src_path, dst_path, settings)
+    else:
+        # Decode/encode errors propagate, so run_photo_jobs reports the photo and retries it next build
+        load_pil()
         with Image.open(src_path) as img:
-            # Convert to RGB if necessary (for PNG with transparency)
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
-            
-            # Resize if larger than max dimensions
-            original_size = img.size
-            img.thumbnail((MAX_PHOTO_WIDTH, MAX_PHOTO_HEIGHT), Image.LANCZOS)
-            
-            # Save as JPEG with compression
-            dst_path_jpg = dst_path.rsplit('.', 1)[0] + '.jpg'
-            img.save(dst_path_jpg, 'JPEG', quality=JPEG_QUALITY, optimize=True)
-            
-            return dst_path_jpg
-    except Exception as e:
-        # If compression fails, just copy original
-        shutil.copy2(src_path, dst_path)
-        return dst_path
+            img = prepare_photo(img, settings)
+            record['width'], record['height'] = img.size
+            if settings.get('quality_mode') == 'ssim':
+                settings = dict(settings, jpeg_quality=find_jpeg_quality(img, settings))
+                record['quality'] = settings['jpeg_quality']
+                record['source_bytes'] = os.path.getsize(src_path)
+            record.update(get_placeholders(img, settings['placeholder_size']))
+            formats = ['jpg'] + settings['formats']
+            widths = [w for w in settings['widths'] if w < img.width] + [img.width]
+            for width in widths:
+                if width == img.width:
+                    resized, suffix = img, ''
+                else:
+                    height = max(1, round(img.height * width / img.width))
+                    resized, suffix = img.resize((width, height), Image.LANCZOS), f"-{width}w"
+                for fmt in formats:
+                    variant_name = f"{base}{suffix}.{fmt}"
+                    save_photo_variant(resized, os.path.join(dest_folder, variant_name), fmt, settings)
+                    record['variants'].setdefault(fmt, []).append([width, variant_name])
+            for kind, size in settings['thumbnails'].items():
+                thumb = make_thumbnail(img, size)
+                record['thumbs'][kind] = {'width': thumb.width, 'height': thumb.height}
+                for fmt in formats:
+                    thumb_name = f"{base}-{kind}.{fmt}"
+                    save_photo_variant(thumb, os.path.join(dest_folder, thumb_name), fmt, settings)
+                    record['thumbs'][kind][fmt] = thumb_name
+    
+    output_names = [variant_name for variants in record['variants'].values() for _, variant_name in variants]
+    for thumb in record['thumbs'].values():
+        output_names += [thumb[fmt] for fmt in thumb if fmt not in ('width', 'height')]
+    for output_name in output_names + [name]:
+        record['files'][output_name] = os.path.getsize(os.path.join(dest_folder, output_name))
+    return record
+
+
+def get_placeholders(img, size):
+    """Average colour ('#rrggbb') and a tiny JPEG data URI for the photo's placeholder"""
+    red, green, blue = img.convert('RGB').resize((1, 1), Image.BOX).getpixel((0, 0))
+    tiny = img.convert('RGB')
+    tiny.thumbnail((size, size), Image.BOX)
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'JPEG', quality=40)
+    return {
+        'color': f"#{red:02x}{green:02x}{blue:02x}",
+        'blur': "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('ascii'),
+    }
+
+
+def make_thumbnail(img, size):
+    """Center-crop img to the aspect ratio of size, never upscaling"""
+    width, height = size
+    scale = min(1.0, img.width / width, img.height / height)
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return ImageOps.fit(img, target, Image.LANCZOS)
+
+
+def get_modern_formats():
+    """RESPONSIVE_FORMATS that this Pillow build can actually write"""
+    if not HAS_PIL:
+        return []
+    load_pil()
+    Image.init()
+    saveable = {'webp': 'WEBP', 'avif': 'AVIF'}
+    return [fmt for fmt in RESPONSIVE_FORMATS if saveable.get(fmt) in Image.SAVE]
+
+
+def get_photo_settings():
+    """Compression settings that affect photo output (part of the cache key)"""
+    settings = {
+        'compress': COMPRESS_PHOTOS,
+        'max_width': MAX_PHOTO_WIDTH,
+        'max_height': MAX_PHOTO_HEIGHT,
+        'jpeg_quality': JPEG_QUALITY,
+        'widths': list(RESPONSIVE_WIDTHS) if RESPONSIVE_IMAGES else [],
+        'formats': get_modern_formats() if RESPONSIVE_IMAGES else [],
+        'webp_quality': WEBP_QUALITY,
+        'avif_quality': AVIF_QUALITY,
+        'avif_speed': AVIF_SPEED,
+        'thumbnails': {kind: list(size) for kind, size in THUMBNAIL_SIZES.items()},
+        'placeholder_size': PLACEHOLDER_SIZE,
+    }
+    if JPEG_QUALITY_MODE == 'ssim':
+        settings.update(quality_mode='ssim', ssim_target=SSIM_TARGET, quality_range=list(JPEG_QUALITY_RANGE))
+    return settings
+
+
+def get_photo_workers():
+    """Number of worker processes for photo encoding"""
+    if PHOTO_WORKERS and PHOTO_WORKERS > 0:
+        return PHOTO_WORKERS
+    return os.cpu_count() or 1
+
+
+def load_photo_cache(output_folder):
+    """Load the photo cache manifest, or an empty cache if missing/corrupt"""
+    return load_cache_file(output_folder, PHOTO_CACHE_FILE)
+
+
+def save_photo_cache(output_folder, cache):
+    save_cache_file(output_folder, PHOTO_CACHE_FILE, cache)
+
+
+def get_photo_cache_key(src_path, source_hash=None):
+    """Cache key for a source photo: path, size, mtime and compression settings.
+
+    Store photos (PHOTO_STORE) are keyed by content instead, so any copy of
+    the same source file hits the same entry.
+    """
+    stat = os.stat(src_path)
+    if source_hash:
+        return {'sha256': source_hash, 'size': stat.st_size, 'settings': get_photo_settings()}
+    return {
+        'src': os.path.abspath(src_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'settings': get_photo_settings(),
+    }
+
+
+def get_source_hash(src_path, source_hashes):
+    """sha256 of a source photo, reused from source_hashes ({path: [size, mtime, sha256]}) while unchanged"""
+    signature = get_file_signature(src_path)
+    entry = source_hashes.get(src_path)
+    if entry and entry[:2] == signature:
+        return entry[2]
+    digest = hash_file(src_path)
+    source_hashes[src_path] = signature + [digest]
+    return digest
+
+
+def get_store_name(source_hash):
+    """File name in the photo store: source content plus encode settings, so a name never changes meaning"""
+    settings = json.dumps(get_photo_settings(), sort_keys=True)
+    return hashlib.sha256(f"{source_hash}:{settings}".encode('utf-8')).hexdigest()[:20] + '.jpg'
+
+
+def is_photo_cached(cache, cache_id, key, dst_path):
+    """True if every output of dst_path was produced from the same source and settings"""
+    entry = cache.get(cache_id)
+    if not entry or entry.get('key') != key:
+        return False
+    dest_folder = os.path.dirname(dst_path)
+    try:
+        return all(os.path.getsize(os.path.join(dest_folder, name)) == size
+                   for name, size in entry['record']['files'].items())
+    except (OSError, KeyError):
+        return False
+
 
+def plan_property_photos(property_folder, prop_id, output_folder, max_photos=10, source_hashes=None):
+    """List the photo jobs for one listing, in display order.
 
-def copy_property_photos(property_folder, prop_id, output_folder, max_photos=10):
-    photos_copied = []
+    With source_hashes (a dict, see get_source_hash) the jobs write to the
+    content-addressed PHOTO_STORE_FOLDER instead of photos/<prop_id>/.
+    """
+    jobs = []
     
     if not property_folder or pd.isna(property_folder):
-        return photos_copied
+        return jobs
     
     source_folder = os.path.join(PHOTO_BASE_PATH, str(property_folder), 'watermark')
     
     if not os.path.exists(source_folder):
-        return photos_copied
+        return jobs
     
     dest_folder = os.path.join(output_folder, 'photos', str(prop_id))
-    os.makedirs(dest_folder, exist_ok=True)
     
     image_extensions = ('.jpg', '.jpeg', '.png', '.webp')
     photo_files = [f for f in os.listdir(source_folder) if f.lower().endswith(image_extensions)]
@@ -212,37 +961,277 @@ def copy_property_photos(property_folder, prop_id, output_folder, max_photos=10)
     photo_files = photo_files[:max_photos]
     
     for photo in photo_files:
-        src = os.path.join(source_folder, photo)
         # Always save as .jpg for consistency
         photo_name = photo.rsplit('.', 1)[0] + '.jpg'
-        dst = os.path.join(dest_folder, photo_name)
+        job = {
+            'prop_id': str(prop_id),
+            'name': photo_name,
+            'cache_id': f"photos/{prop_id}/{photo_name}",
+            'folder': f"photos/{prop_id}",
+            'src': os.path.join(source_folder, photo),
+            'dst': os.path.join(dest_folder, photo_name),
+            'settings': get_photo_settings(),
+        }
+        if source_hashes is not None:
+            try:
+                job['source_hash'] = get_source_hash(job['src'], source_hashes)
+            except OSError:
+                jobs.append(job)        # run_photo_jobs reports the unreadable file
+                continue
+            store_name = get_store_name(job['source_hash'])
+            job.update(
+                cache_id=f"photos/{PHOTO_STORE_FOLDER}/{store_name}",
+                folder=f"photos/{PHOTO_STORE_FOLDER}",
+                dst=os.path.join(output_folder, 'photos', PHOTO_STORE_FOLDER, store_name),
+            )
+        jobs.append(job)
+    
+    return jobs
+
+
+def encode_photo_job(job):
+    """Worker: encode one photo job, returning its result instead of raising"""
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(job['dst']), exist_ok=True)
+        record = encode_photo(job['src'], job['dst'], job['settings'])
+        return {'record': record, 'error': None, 'seconds': time.perf_counter() - start}
+    except Exception as e:
+        return {'record': None, 'error': f"{type(e).__name__}: {e}", 'seconds': time.perf_counter() - start}
+
+
+def run_photo_jobs(jobs, cache=None, workers=None):
+    """Encode photo jobs, in parallel when workers > 1.
+
+    Up-to-date outputs (per the cache) are skipped, and jobs writing the same
+    store photo are encoded once. Results come back in job
+    order, so the output does not depend on worker scheduling. Returns
+    {prop_id: {'photos': [photo records], 'errors': [(photo name, error)],
+    'cache_hits', 'seconds', 'input_bytes', 'output_bytes'}} where each record
+    (see encode_photo) also carries its URL 'folder'. A Property_ID on several
+    masterbook rows plans the same photos once per row; each photo is listed once.
+    """
+    if workers is None:
+        workers = get_photo_workers()
+    
+    results = {}
+    pending = []
+    shared = []
+    pending_ids = set()
+    for job in jobs:
+        results.setdefault(job['prop_id'], {'photos': [], 'errors': [], 'cache_hits': 0, 'seconds': 0.0,
+                                            'input_bytes': 0, 'output_bytes': 0})
+        if cache is not None:
+            try:
+                job['key'] = get_photo_cache_key(job['src'], job.get('source_hash'))
+            except OSError as e:
+                job['result'] = {'record': None, 'error': f"{type(e).__name__}: {e}"}
+                continue
+            if is_photo_cached(cache, job['cache_id'], job['key'], job['dst']):
+                job['result'] = {'record': cache[job['cache_id']]['record'], 'error': None, 'cached': True}
+                continue
+        if job['cache_id'] in pending_ids:
+            shared.append(job)
+            continue
+        pending_ids.add(job['cache_id'])
+        pending.append(job)
+    
+    if workers > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            encoded = list(executor.map(encode_photo_job, pending, chunksize=chunksize))
+    else:
+        encoded = [encode_photo_job(job) for job in pending]
+    
+    encoded_by_id = {}
+    for job, result in zip(pending, encoded):
+        job['result'] = result
+        encoded_by_id[job['cache_id']] = result
+        if cache is not None and result['error'] is None:
+            cache[job['cache_id']] = {'key': job['key'], 'record': result['record']}
+    for job in shared:
+        job['result'] = dict(encoded_by_id[job['cache_id']], seconds=0.0, cached=True)
+    
+    merged = set()
+    for job in jobs:
+        if (job['prop_id'], job['dst']) in merged:
+            continue
+        merged.add((job['prop_id'], job['dst']))
+        listing = results[job['prop_id']]
+        result = job['result']
+        listing['seconds'] += result.get('seconds', 0.0)
+        listing['cache_hits'] += bool(result.get('cached'))
+        if 'key' in job:
+            listing['input_bytes'] += job['key']['size']
+        if result['error'] is None:
+            listing['photos'].append(dict(result['record'], folder=job['folder']))
+            listing['output_bytes'] += sum(result['record']['files'].values())
+        else:
+            listing['errors'].append((job['name'], result['error']))
+    
+    return results
+
+
+def copy_property_photos(property_folder, prop_id, output_folder, max_photos=10, cache=None):
+    jobs = plan_property_photos(property_folder, prop_id, output_folder, max_photos)
+    results = run_photo_jobs(jobs, cache, workers=1)
+    return results.get(str(prop_id), {}).get('photos', [])
+
+
+def get_quality_summary(records):
+    """Size distribution of 'ssim' mode photos: source vs main JPEG bytes and chosen qualities"""
+    # Store-mode photos shared by several listings are counted once
+    records = list({(record['folder'], record['name']): record for record in records if 'quality' in record}.values())
+    if not records:
+        return None
+    
+    def percentiles(values):
+        values = sorted(values)
+        return {f"p{p}": values[min(len(values) - 1, len(values) * p // 100)] for p in (10, 50, 90)}
+    
+    source = [record['source_bytes'] for record in records]
+    output = [record['files'][record['name']] for record in records]
+    qualities = {}
+    for record in records:
+        qualities[record['quality']] = qualities.get(record['quality'], 0) + 1
+    return {
+        'photos': len(source),
+        'source_bytes': percentiles(source),
+        'jpeg_bytes': percentiles(output),
+        'saved_percent': round(100 * (1 - sum(output) / max(1, sum(source))), 1),
+        'qualities': {str(quality): count for quality, count in sorted(qualities.items())},
+    }
+
+
+def plan_listing_photos(listing, output_folder, source_hashes=None):
+    """Photo jobs for one listing: the full ordered photo set, planned once.
+
+    The card shows the first MAX_PHOTOS_PER_PROPERTY photos and the detail
+    page the first MAX_PHOTOS_DETAIL_PAGE, so both take slices of this list.
+    Closed listings have no detail page and only need the card photos.
+    """
+    max_photos = MAX_PHOTOS_PER_PROPERTY if listing.is_closed else max(MAX_PHOTOS_PER_PROPERTY, MAX_PHOTOS_DETAIL_PAGE)
+    return plan_property_photos(listing.property_folder, listing.prop_id, output_folder, max_photos, source_hashes)
+
+
+def get_dhash(path):
+    """64-bit difference hash: near-identical images differ in only a few bits"""
+    load_pil()
+    with Image.open(path) as img:
+        img.draft('L', (64, 64))
+        small = img.convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] < pixels[row * 9 + col + 1])
+    return bits
+
+
+def find_near_duplicates(listing_photos, output_folder):
+    """Pairs of distinct photo files within PHOTO_DUPLICATE_DISTANCE bits of each other.
+
+    Hashes the card thumbnail (or the main JPEG) of every photo file once.
+    Returns [{'photos': [url, url], 'distance', 'listings': [prop_ids]}].
+    """
+    users = {}
+    for prop_id, photos in listing_photos.items():
+        for photo in photos:
+            thumb = photo.get('thumbs', {}).get('card')
+            url = get_photo_url(photo, thumb['jpg'] if thumb else None)
+            users.setdefault(url, set()).add(prop_id)
+    hashes = []
+    for url in sorted(users):
         try:
-            compress_and_copy_photo(src, dst)
-            photos_copied.append(photo_name)
-        except:
-            pass
+            hashes.append((url, get_dhash(os.path.join(output_folder, url))))
+        except Exception:
+            continue
     
-    return photos_copied
+    duplicates = []
+    for i, (url_a, hash_a) in enumerate(hashes):
+        for url_b, hash_b in hashes[i + 1:]:
+            distance = bin(hash_a ^ hash_b).count('1')
+            if distance <= PHOTO_DUPLICATE_DISTANCE:
+                duplicates.append({'photos': [url_a, url_b], 'distance': distance,
+                                   'listings': sorted(users[url_a] | users[url_b])})
+    return sorted(duplicates, key=lambda pair: pair['distance'])
+
+
+def get_photo_url(photo, file_name=None):
+    return f"{photo['folder']}/{file_name or photo['name']}"
+
+
+def get_srcset(photo, fmt):
+    variants = photo.get('variants', {}).get(fmt, [])
+    return ', '.join(f"{get_photo_url(photo, name)} {width}w" for width, name in variants)
+
+
+def get_image_attrs(photo, size, blur=False):
+    """width/height and placeholder background for a photo's <img>
+
+    blur=True uses the inline micro-JPEG (only worth it above the fold).
+    """
+    width, height = size
+    attrs = f' width="{width}" height="{height}"' if width and height else ''
+    color = photo.get('color') if PHOTO_PLACEHOLDER else None
+    if not color:
+        return attrs
+    if blur and PHOTO_PLACEHOLDER == 'blur' and photo.get('blur'):
+        return attrs + f' style="background:{color} url({photo["blur"]}) center/cover"'
+    return attrs + f' style="background:{color}"'
+
+
+def render_picture(photo, alt, sizes, attrs='', blur=False):
+    """<picture> for a photo record: AVIF/WebP sources with a JPEG <img> fallback"""
+    if not photo:
+        return f'<img src="" alt="{alt}"{attrs}>'
+    
+    sources = ''
+    for fmt in ('avif', 'webp'):
+        srcset = get_srcset(photo, fmt)
+        if srcset:
+            sources += f'<source type="image/{fmt}" srcset="{srcset}" sizes="{sizes}">'
+    
+    srcset = get_srcset(photo, 'jpg') if len(photo.get('variants', {}).get('jpg', [])) > 1 else ''
+    srcset_attr = f' srcset="{srcset}" sizes="{sizes}"' if srcset else ''
+    image_attrs = get_image_attrs(photo, (photo.get('width'), photo.get('height')), blur)
+    img = f'<img src="{get_photo_url(photo)}"{srcset_attr} alt="{alt}"{image_attrs}{attrs}>'
+    
+    if not sources:
+        return img
+    return f'<picture>{sources}{img}</picture>'
+
+
+def render_thumbnail(photo, kind, alt, attrs=''):
+    """<picture> for a cropped thumbnail, falling back to the full photo"""
+    thumb = photo.get('thumbs', {}).get(kind) if photo else None
+    if not thumb:
+        return render_picture(photo, alt, CARD_IMAGE_SIZES if kind == 'card' else GALLERY_IMAGE_SIZES, attrs)
+    
+    sources = ''
+    for fmt in ('avif', 'webp'):
+        if fmt in thumb:
+            sources += f'<source type="image/{fmt}" srcset="{get_photo_url(photo, thumb[fmt])}">'
+    image_attrs = get_image_attrs(photo, (thumb['width'], thumb['height']))
+    img = f'<img src="{get_photo_url(photo, thumb["jpg"])}" alt="{alt}"{image_attrs}{attrs}>'
+    
+    if not sources:
+        return img
+    return f'<picture>{sources}{img}</picture>'
 
 
 # =============================================================================
-# MAIN PAGE TEMPLATE
+# SITE ASSETS
 # =============================================================================
 
-def get_main_template():
-    return '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Adelyn Wong | Real Estate Matchmaker Since 2012</title>
-    <meta name="description" content="Adelyn Wong - Real Estate Matchmaker specializing in Setia Alam, Setia Eco Park, Eco Ardence & Klang. 12+ years experience.">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@400;500;600;700&family=Montserrat:wght@300;400;500;600&display=swap" rel="stylesheet">
-    <style>
-        ''' + get_shared_styles() + '''
-
+def get_main_styles():
+    return '''
+        .hero { margin-top: 70px; background: var(--bg-cream); position: relative; overflow: hidden; }
+        .hero-banner { width: 100%; display: block; }
+        .hero-banner img { width: 100%; height: auto; display: block; }
         .stats { padding: 3rem 2rem; background: var(--bg-white); margin-top: 70px; }
+        .hero + .stats { margin-top: 0; }
         .stats-container { max-width: 1200px; margin: 0 auto; display: grid; grid-template-columns: repeat(4, 1fr); gap: 1.5rem; }
         .stat-item { text-align: center; padding: 1.5rem; background: var(--bg-light); border-radius: 8px; border-left: 3px solid var(--primary-gold); }
         .stat-number { font-family: var(--font-display); font-size: 2.5rem; font-weight: 600; color: var(--primary-dark); }
@@ -255,7 +1244,7 @@ def get_main_template():
         .section-subtitle { font-size: 0.9rem; color: var(--text-light); }
 
         .filter-tabs { display: flex; justify-content: center; flex-wrap: wrap; gap: 0.5rem; margin-bottom: 2.5rem; }
-        .filter-tab { padding: 0.6rem 1.2rem; border: 1px solid #e0e0e0; border-radius: 25px; background: var(--bg-white); font-family: var(--font-body); font-size: 0.8rem; cursor: pointer; transition: var(--transition); }
+        .filter-tab { padding: 0.6rem 1.2rem; border: 1px solid #e0e0e0; border-radius: 25px; background: var(--bg-white); color: var(--text-dark); font-family: var(--font-body); font-size: 0.8rem; text-decoration: none; cursor: pointer; transition: var(--transition); }
         .filter-tab:hover, .filter-tab.active { background: var(--primary-dark); color: var(--bg-white); border-color: var(--primary-dark); }
 
         .property-grid { max-width: 1400px; margin: 0 auto; display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 1.5rem; }
@@ -300,102 +1289,21 @@ def get_main_template():
             .stats-container { grid-template-columns: repeat(2, 1fr); }
             .property-grid { grid-template-columns: 1fr; }
         }
-    </style>
-</head>
-<body>
-    <nav class="navbar">
-        <div class="nav-container">
-            <a href="index.html" class="logo">ADELYN<span>WONG</span></a>
-            <ul class="nav-links">
-                <li><a href="index.html">Home</a></li>
-                <li><a href="#listings">Listings</a></li>
-                <li><a href="#contact">Contact</a></li>
-            </ul>
-            <button class="mobile-toggle">☰</button>
-        </div>
-    </nav>
-
-    <section class="stats">
-        <div class="stats-container">
-            <div class="stat-item">
-                <div class="stat-number">12<span>+</span></div>
-                <div class="stat-label">Years Experience</div>
-            </div>
-            <div class="stat-item">
-                <div class="stat-number">{total_properties}<span>+</span></div>
-                <div class="stat-label">Properties Managed</div>
-            </div>
-            <div class="stat-item">
-                <div class="stat-number">{active_listings}</div>
-                <div class="stat-label">Active Listings</div>
-            </div>
-            <div class="stat-item">
-                <div class="stat-number">{closed_deals}<span>+</span></div>
-                <div class="stat-label">Deals Closed</div>
-            </div>
-        </div>
-    </section>
 
-    <section class="listings" id="listings">
-        <div class="section-header">
-            <h2 class="section-title">Property Listings</h2>
-            <p class="section-subtitle">Find your perfect home in Setia Alam, Eco Park & Eco Ardence</p>
-        </div>
-        
-        <div class="filter-tabs">
-            <button class="filter-tab active" data-filter="all">All</button>
-            <button class="filter-tab" data-filter="rent">For Rent</button>
-            <button class="filter-tab" data-filter="sale">For Sale</button>
-            <button class="filter-tab" data-filter="setia-eco-park">Setia Eco Park</button>
-            <button class="filter-tab" data-filter="eco-ardence">Eco Ardence</button>
-            <button class="filter-tab" data-filter="setia-city">Setia City</button>
-        </div>
-        
-        <div class="property-grid">
-{property_cards}
-        </div>
-    </section>
+        .pagination { display: flex; justify-content: center; align-items: center; gap: 1rem; margin-top: 2.5rem; font-size: 0.85rem; }
+        .page-link { padding: 0.6rem 1.2rem; border: 1px solid #e0e0e0; border-radius: 25px; color: var(--text-dark); text-decoration: none; transition: var(--transition); }
+        .page-link:hover { background: var(--primary-dark); color: var(--bg-white); border-color: var(--primary-dark); }
+        .page-info { color: var(--text-light); }
 
-    <section class="contact" id="contact" style="padding: 4rem 2rem; background: var(--bg-cream);">
-        <div style="max-width: 800px; margin: 0 auto; text-align: center;">
-            <h2 class="section-title">Get In Touch</h2>
-            <p class="section-subtitle">Ready to find your dream home? Contact me today!</p>
-            <div style="display: flex; flex-wrap: wrap; justify-content: center; gap: 1rem; margin-top: 2rem;">
-                <a href="https://wa.me/{whatsapp}" style="display: inline-flex; align-items: center; gap: 0.5rem; padding: 1rem 2rem; border-radius: 50px; font-weight: 500; text-decoration: none; background: var(--green-whatsapp); color: white;" target="_blank">WhatsApp</a>
-                <a href="weixin://dl/chat?{wechat_id}" style="display: inline-flex; align-items: center; gap: 0.5rem; padding: 1rem 2rem; border-radius: 50px; font-weight: 500; text-decoration: none; background: #07c160; color: white;">WeChat: {wechat_id}</a>
-            </div>
-        </div>
-    </section>
-
-    <footer class="footer">
-        <div class="footer-logo">ADELYN<span>WONG</span></div>
-        <p class="footer-text">Connecting People to Real Estate Since 2012</p>
-        <p class="footer-ren">REN 03144 | CID Realtors</p>
-        <p class="footer-text" style="margin-top: 1rem; font-size: 0.75rem;">Updated: {generated_date}</p>
-    </footer>
-
-    <a href="https://wa.me/{whatsapp}" class="whatsapp-float" target="_blank">
-        <svg viewBox="0 0 24 24"><path d="M17.472 14.382c-.297-.149-1.758-.867-2.03-.967-.273-.099-.471-.148-.67.15-.197.297-.767.966-.94 1.164-.173.199-.347.223-.644.075-.297-.15-1.255-.463-2.39-1.475-.883-.788-1.48-1.761-1.653-2.059-.173-.297-.018-.458.13-.606.134-.133.298-.347.446-.52.149-.174.198-.298.298-.497.099-.198.05-.371-.025-.52-.075-.149-.669-1.612-.916-2.207-.242-.579-.487-.5-.669-.51-.173-.008-.371-.01-.57-.01-.198 0-.52.074-.792.372-.272.297-1.04 1.016-1.04 2.479 0 1.462 1.065 2.875 1.213 3.074.149.198 2.096 3.2 5.077 4.487.709.306 1.262.489 1.694.625.712.227 1.36.195 1.871.118.571-.085 1.758-.719 2.006-1.413.248-.694.248-1.289.173-1.413-.074-.124-.272-.198-.57-.347m-5.421 7.403h-.004a9.87 9.87 0 01-5.031-1.378l-.361-.214-3.741.982.998-3.648-.235-.374a9.86 9.86 0 01-1.51-5.26c.001-5.45 4.436-9.884 9.888-9.884 2.64 0 5.122 1.03 6.988 2.898a9.825 9.825 0 012.893 6.994c-.003 5.45-4.437 9.884-9.885 9.884m8.413-18.297A11.815 11.815 0 0012.05 0C5.495 0 .16 5.335.157 11.892c0 2.096.547 4.142 1.588 5.945L.057 24l6.305-1.654a11.882 11.882 0 005.683 1.448h.005c6.554 0 11.89-5.335 11.893-11.893a11.821 11.821 0 00-3.48-8.413z"/></svg>
-    </a>
+        .property-grid .property-card { content-visibility: auto; contain-intrinsic-size: auto 420px; }
+        .card-feed { height: 1px; }
+    '''
 
-    <script>
-        document.querySelectorAll('.filter-tab').forEach(tab => {
-            tab.addEventListener('click', () => {
-                document.querySelectorAll('.filter-tab').forEach(t => t.classList.remove('active'));
-                tab.classList.add('active');
-                const filter = tab.dataset.filter;
-                document.querySelectorAll('.property-card').forEach(card => {
-                    if (filter === 'all') {
-                        card.style.display = 'block';
-                    } else {
-                        const matches = card.dataset.type === filter || card.dataset.location === filter;
-                        card.style.display = matches ? 'block' : 'none';
-                    }
-                });
-            });
-        });
 
-        document.querySelectorAll('.carousel').forEach(carousel => {
+def get_main_script():
+    return '''
+        function initCarousel(carousel) {
+            carousel.dataset.ready = '1';
             const inner = carousel.querySelector('.carousel-inner');
             const items = carousel.querySelectorAll('.carousel-item');
             const dots = carousel.querySelectorAll('.carousel-dot');
@@ -415,29 +1323,87 @@ def get_main_template():
             if (prevBtn) prevBtn.addEventListener('click', (e) => { e.preventDefault(); e.stopPropagation(); goTo(current - 1); });
             if (nextBtn) nextBtn.addEventListener('click', (e) => { e.preventDefault(); e.stopPropagation(); goTo(current + 1); });
             dots.forEach((dot, i) => dot.addEventListener('click', (e) => { e.preventDefault(); e.stopPropagation(); goTo(i); }));
-        });
-    </script>
-</body>
-</html>'''
+        }
 
+        document.querySelectorAll('.carousel').forEach(initCarousel);
+    '''
 
-# =============================================================================
-# DETAIL PAGE TEMPLATE
-# =============================================================================
 
-def get_detail_template():
-    return '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{property_title} | Adelyn Wong</title>
-    <meta name="description" content="{meta_description}">
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@400;500;600;700&family=Montserrat:wght@300;400;500;600&display=swap" rel="stylesheet">
-    <style>
-        ''' + get_shared_styles() + '''
+def get_feed_script():
+    """Renders the cards after the first screenful from listings.json (INDEX_MODE = 'virtual')"""
+    return '''
+        (function () {
+            const sentinel = document.querySelector('.card-feed');
+            if (!sentinel) return;
+            const grid = document.querySelector('.property-grid');
+            const batch = parseInt(sentinel.dataset.batch, 10) || 12;
+            let items = [];
+            let next = parseInt(sentinel.dataset.skip, 10) || 0;
+
+            function esc(value) {
+                return String(value).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+            }
+
+            function picture(item, url, i) {
+                const base = url.replace(/\\.jpg$/, '');
+                const sources = item.formats.map(fmt => '<source type="image/' + fmt + '" srcset="' + esc(base + '.' + fmt) + '">').join('');
+                const [width, height] = item.sizes[i];
+                const size = width && height ? ' width="' + width + '" height="' + height + '"' : '';
+                const color = item.colors[i] ? ' style="background:' + esc(item.colors[i]) + '"' : '';
+                const img = '<img src="' + esc(url) + '" alt="' + esc(item.location) + '"' + size + color + ' loading="lazy">';
+                return sources ? '<picture>' + sources + img + '</picture>' : img;
+            }
 
+            function renderCard(item) {
+                let image;
+                if (item.thumbs.length) {
+                    const slides = item.thumbs.map((url, i) => '<div class="carousel-item">' + picture(item, url, i) + '</div>').join('');
+                    const dots = item.thumbs.map((_, i) => '<span class="carousel-dot ' + (i === 0 ? 'active' : '') + '"></span>').join('');
+                    image = '<div class="carousel"><div class="carousel-inner">' + slides + '</div>' +
+                        '<button class="carousel-btn prev">‹</button><button class="carousel-btn next">›</button>' +
+                        '<div class="carousel-dots">' + dots + '</div><span class="photo-count">' + item.thumbs.length + ' photos</span></div>';
+                } else {
+                    image = '<span class="icon">' + item.icon + '</span>';
+                }
+                const closed = item.status !== 'available';
+                const status = closed
+                    ? '<span class="badge badge-status let-out">' + item.status.toUpperCase() + '</span>'
+                    : '<span class="badge badge-status">AVAILABLE</span>';
+                const typeBadge = '<span class="badge badge-type ' + (item.is_sale ? 'for-sale' : '') + '">' + (item.is_sale ? 'For Sale' : 'For Rent') + '</span>';
+                const action = closed
+                    ? '<button class="btn-closed" disabled>✓ ' + (item.status === 'let out' ? 'Let Out' : 'Sold') + '</button>'
+                    : '<span class="btn-view">View Details →</span>';
+                const attrs = 'class="property-card" data-type="' + item.type + '" data-location="' + item.area + '"';
+                const open = closed ? '<div ' + attrs + '>' : '<a href="' + esc(item.url) + '" ' + attrs + '>';
+                return open +
+                    '<div class="property-image">' + image + '<div class="property-badges">' + status + typeBadge + '</div></div>' +
+                    '<div class="property-content">' +
+                    '<p class="property-location">' + esc(item.location) + '</p>' +
+                    '<h3 class="property-type">' + esc(item.title) + '</h3>' +
+                    '<div class="property-specs"><span>🛏️ ' + esc(item.beds) + '</span><span>🚿 ' + esc(item.baths) + ' Baths</span><span>📐 ' + esc(item.sqft) + ' sqft</span></div>' +
+                    '<p class="property-price">' + esc(item.price) + '</p>' +
+                    '<div class="property-actions">' + action + '</div></div>' +
+                    (closed ? '</div>' : '</a>');
+            }
+
+            const observer = new IntersectionObserver(entries => {
+                if (!entries.some(entry => entry.isIntersecting)) return;
+                const end = Math.min(next + batch, items.length);
+                grid.insertAdjacentHTML('beforeend', items.slice(next, end).map(renderCard).join(''));
+                grid.querySelectorAll('.carousel:not([data-ready])').forEach(initCarousel);
+                next = end;
+                if (next >= items.length) observer.disconnect();
+            }, { rootMargin: '800px 0px' });
+
+            fetch(sentinel.dataset.feed)
+                .then(response => response.json())
+                .then(data => { items = data; observer.observe(sentinel); });
+        })();
+    '''
+
+
+def get_detail_styles():
+    return '''
         .detail-container { max-width: 1200px; margin: 0 auto; padding: 90px 2rem 4rem; }
         
         .back-btn { display: inline-flex; align-items: center; gap: 0.5rem; color: var(--text-light); text-decoration: none; font-size: 0.9rem; margin-bottom: 1.5rem; transition: var(--transition); }
@@ -449,7 +1415,7 @@ def get_detail_template():
         .hero-side { display: grid; grid-template-rows: 1fr 1fr; gap: 0.5rem; }
         .hero-side img { width: 100%; height: 100%; object-fit: cover; cursor: pointer; }
         .hero-more { position: relative; }
-        .hero-more::after { content: '+{more_photos} photos'; position: absolute; inset: 0; background: rgba(0,0,0,0.5); color: white; display: flex; align-items: center; justify-content: center; font-weight: 600; cursor: pointer; }
+        .hero-more::after { position: absolute; inset: 0; background: rgba(0,0,0,0.5); color: white; display: flex; align-items: center; justify-content: center; font-weight: 600; cursor: pointer; }
         
         .property-header { display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 1rem; margin-bottom: 2rem; }
         .property-info h1 { font-family: var(--font-display); font-size: 2rem; font-weight: 600; color: var(--primary-dark); margin-bottom: 0.5rem; }
@@ -513,7 +1479,450 @@ def get_detail_template():
             .action-buttons { flex-direction: column; }
             .action-btn { width: 100%; }
         }
+    '''
+
+
+def get_detail_script():
+    return '''
+        let currentSlide = 0;
+
+        function openLightbox(index) {
+            currentSlide = index;
+            document.getElementById('lightbox-img').src = photos[currentSlide];
+            document.getElementById('lightbox').classList.add('active');
+            document.body.style.overflow = 'hidden';
+        }
+
+        function closeLightbox() {
+            document.getElementById('lightbox').classList.remove('active');
+            document.body.style.overflow = '';
+        }
+
+        function changeSlide(dir) {
+            currentSlide += dir;
+            if (currentSlide < 0) currentSlide = photos.length - 1;
+            if (currentSlide >= photos.length) currentSlide = 0;
+            document.getElementById('lightbox-img').src = photos[currentSlide];
+        }
+
+        document.addEventListener('keydown', (e) => {
+            if (!document.getElementById('lightbox').classList.contains('active')) return;
+            if (e.key === 'Escape') closeLightbox();
+            if (e.key === 'ArrowLeft') changeSlide(-1);
+            if (e.key === 'ArrowRight') changeSlide(1);
+        });
+    '''
+
+
+def get_whatsapp_icon():
+    return '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="white"><path d="M17.472 14.382c-.297-.149-1.758-.867-2.03-.967-.273-.099-.471-.148-.67.15-.197.297-.767.966-.94 1.164-.173.199-.347.223-.644.075-.297-.15-1.255-.463-2.39-1.475-.883-.788-1.48-1.761-1.653-2.059-.173-.297-.018-.458.13-.606.134-.133.298-.347.446-.52.149-.174.198-.298.298-.497.099-.198.05-.371-.025-.52-.075-.149-.669-1.612-.916-2.207-.242-.579-.487-.5-.669-.51-.173-.008-.371-.01-.57-.01-.198 0-.52.074-.792.372-.272.297-1.04 1.016-1.04 2.479 0 1.462 1.065 2.875 1.213 3.074.149.198 2.096 3.2 5.077 4.487.709.306 1.262.489 1.694.625.712.227 1.36.195 1.871.118.571-.085 1.758-.719 2.006-1.413.248-.694.248-1.289.173-1.413-.074-.124-.272-.198-.57-.347m-5.421 7.403h-.004a9.87 9.87 0 01-5.031-1.378l-.361-.214-3.741.982.998-3.648-.235-.374a9.86 9.86 0 01-1.51-5.26c.001-5.45 4.436-9.884 9.888-9.884 2.64 0 5.122 1.03 6.988 2.898a9.825 9.825 0 012.893 6.994c-.003 5.45-4.437 9.884-9.885 9.884m8.413-18.297A11.815 11.815 0 0012.05 0C5.495 0 .16 5.335.157 11.892c0 2.096.547 4.142 1.588 5.945L.057 24l6.305-1.654a11.882 11.882 0 005.683 1.448h.005c6.554 0 11.89-5.335 11.893-11.893a11.821 11.821 0 00-3.48-8.413z"/></svg>
+'''
+
+
+@lru_cache(maxsize=None)
+def get_site_assets():
+    """Shared CSS/JS/SVG as {name: (content-hashed path, content)}.
+
+    The hash in the file name changes whenever the content does, so browsers
+    and the CDN can cache these files forever.
+    """
+    sources = {
+        'site.css': get_shared_styles(),
+        'main.css': get_main_styles(),
+        'detail.css': get_detail_styles(),
+        'main.js': get_main_script(),
+        'feed.js': get_feed_script(),
+        'detail.js': get_detail_script(),
+        'whatsapp.svg': get_whatsapp_icon(),
+    }
+    assets = {}
+    for name, content in sources.items():
+        if MINIFY_HTML and name.endswith('.css'):
+            content = minify_css(content)
+        elif MINIFY_HTML and name.endswith('.js'):
+            content = minify_js(content)
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:ASSET_HASH_LENGTH]
+        stem, ext = name.rsplit('.', 1)
+        assets[name] = (f"{ASSETS_FOLDER}/{stem}.{digest}.{ext}", content)
+    return assets
+
+
+def get_asset_url(name):
+    return get_site_assets()[name][0]
+
+
+def write_site_assets(output_folder):
+    """Write the content-hashed asset files whose bytes are not on disk yet.
+
+    Written as UTF-8 bytes (no newline translation), so each file matches its hash.
+    """
+    written = []
+    for path, content in get_site_assets().values():
+        full_path = os.path.join(output_folder, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if write_if_changed(full_path, content):
+            written.append(path)
+    return written
+
+
+# Filled by process_site_images(): {source name: image record}, see encode_site_image
+site_images = {}
+
+
+def encode_site_image(src_path, widths, output_folder, settings):
+    """Resize a site image to its display widths and write content-hashed variants.
+
+    Returns {'width', 'height', 'variants': {fmt: [[width, path], ...]},
+    'files': [paths], 'color', 'blur'}, paths relative to output_folder.
+    """
+    load_pil()
+    os.makedirs(os.path.join(output_folder, ASSETS_FOLDER), exist_ok=True)
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    record = {'width': None, 'height': None, 'variants': {}, 'files': []}
+    with Image.open(src_path) as img:
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+        img.info = {key: value for key, value in img.info.items() if key == 'icc_profile'}
+        largest = min(img.width, max(widths))
+        record['width'], record['height'] = largest, max(1, round(img.height * largest / img.width))
+        if settings.get('quality_mode') == 'ssim' and not has_alpha:
+            settings = dict(settings, jpeg_quality=find_jpeg_quality(img, settings))
+        formats = [fmt for fmt in settings['formats'] if fmt == 'webp'] + ['png' if has_alpha else 'jpg']
+        for width in sorted({w for w in widths if w < largest} | {largest}):
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                data = encode_image(resized, fmt, settings)
+                digest = hashlib.sha256(data).hexdigest()[:ASSET_HASH_LENGTH]
+                path = f"{ASSETS_FOLDER}/{stem}-{width}w.{digest}.{fmt}"
+                write_if_changed(os.path.join(output_folder, path), data)
+                record['variants'].setdefault(fmt, []).append([width, path])
+                record['files'].append(path)
+        record.update(get_placeholders(img, settings['placeholder_size']))
+    return record
+
+
+def process_site_images(output_folder):
+    """Encode the SITE_IMAGES whose source or settings changed since the last build.
+
+    Fills site_images and returns (encoded, unchanged, missing) counts.
+    """
+    site_images.clear()
+    if not HAS_PIL:
+        return 0, 0, len(SITE_IMAGES)
+    source_folder = SITE_IMAGES_FOLDER or output_folder
+    settings = get_photo_settings()
+    cache = load_cache_file(output_folder, SITE_IMAGES_CACHE_FILE)
+    new_cache = {}
+    encoded = unchanged = missing = 0
+    for name, widths in SITE_IMAGES.items():
+        src_path = os.path.join(source_folder, name)
+        signature = get_file_signature(src_path)
+        if signature is None:
+            missing += 1
+            continue
+        # Round-tripped through JSON so it compares equal to the cached copy
+        key = json.loads(json.dumps({'signature': signature, 'widths': widths, 'settings': settings}))
+        cached = cache.get(name)
+        if (cached and cached['key'] == key
+                and all(os.path.exists(os.path.join(output_folder, path)) for path in cached['record']['files'])):
+            record = cached['record']
+            unchanged += 1
+        else:
+            record = encode_site_image(src_path, widths, output_folder, settings)
+            encoded += 1
+        site_images[name] = record
+        new_cache[name] = {'key': key, 'record': record}
+    save_cache_file(output_folder, SITE_IMAGES_CACHE_FILE, new_cache)
+    return encoded, unchanged, missing
+
+
+def render_site_image(name, alt, sizes, attrs=''):
+    """<picture> for a processed site image, or '' if it is not available"""
+    image = site_images.get(name)
+    if not image:
+        return ''
+    sources = ''
+    if 'webp' in image['variants']:
+        srcset = ', '.join(f"{path} {width}w" for width, path in image['variants']['webp'])
+        sources = f'<source type="image/webp" srcset="{srcset}" sizes="{sizes}">'
+    fallback = image['variants'].get('jpg') or image['variants']['png']
+    srcset = ', '.join(f"{path} {width}w" for width, path in fallback)
+    image_attrs = get_image_attrs(image, (image['width'], image['height']), blur=True)
+    img = f'<img src="{fallback[-1][1]}" srcset="{srcset}" sizes="{sizes}" alt="{alt}"{image_attrs}{attrs}>'
+    return f'<picture>{sources}{img}</picture>' if sources else img
+
+
+# =============================================================================
+# TEMPLATE ENGINE
+# =============================================================================
+
+PLACEHOLDER_PATTERN = re.compile(r'\{([a-z_][a-z0-9_]*)\}')
+
+
+class CompiledTemplate:
+    """A template parsed once into static segments and {placeholder} slots.
+
+    render() fills every slot in a single join, so substituted values are
+    never scanned again (a description containing "{location}" stays as-is).
+    """
+    __slots__ = ('parts', 'slots', 'digest')
+    
+    def __init__(self, text):
+        pieces = PLACEHOLDER_PATTERN.split(text)
+        # Even indexes are static text, odd indexes are placeholder names
+        self.parts = pieces
+        self.slots = [(i, pieces[i]) for i in range(1, len(pieces), 2)]
+        self.digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @property
+    def names(self):
+        return {name for _, name in self.slots}
+    
+    def render(self, values):
+        missing = self.names - values.keys()
+        if missing:
+            raise KeyError(f"Missing template values: {', '.join(sorted(missing))}")
+        parts = list(self.parts)
+        for i, name in self.slots:
+            parts[i] = str(values[name])
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=None)
+def get_compiled_template(name):
+    """'main' or 'detail' template, compiled on first use"""
+    if name == 'main':
+        return CompiledTemplate(get_main_template())
+    if name == 'detail':
+        return CompiledTemplate(get_detail_template())
+    raise ValueError(f"Unknown template: {name}")
+
+
+# =============================================================================
+# PAGE WRITER
+# =============================================================================
+
+# Kept byte-for-byte; the description keeps its line breaks (white-space: pre-line)
+PRESERVE_PATTERN = re.compile(r'<(pre|textarea)\b.*?</\1\s*>', re.S | re.I)
+DESCRIPTION_PATTERN = re.compile(r'(<div class="description-section">.*?)(<p\b.*?</p>)', re.S)
+EMBED_PATTERN = re.compile(r'(<(style|script)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+COMMENT_PATTERN = re.compile(r'<!--(?!\[if).*?-->', re.S)
+BLOCK_TAG_PATTERN = re.compile(
+    r'\s*(</?(?:html|head|body|meta|link|title|base|style|script|header|footer|nav|section|'
+    r'main|div|p|h[1-6]|ul|ol|li|iframe|button|picture|source)\b[^>]*>)\s*', re.I)
+CSS_STRING_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+# {relative path: [bytes before, bytes after]} for pages written this run
+minify_report = {}
+
+
+def minify_css(css):
+    pieces = CSS_STRING_PATTERN.split(css)
+    for i in range(0, len(pieces), 2):
+        text = re.sub(r'/\*.*?\*/', '', pieces[i], flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        text = re.sub(r':\s+', ':', text)
+        pieces[i] = text.replace(';}', '}')
+    return ''.join(pieces).strip()
+
+
+def minify_js(js):
+    """Trim indentation and blank lines; line breaks stay so ASI is unaffected"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def minify_html(html):
+    """Collapse whitespace and strip comments outside preserved/embedded blocks"""
+    kept = []
+    
+    def keep(text):
+        kept.append(text)
+        return f"\x00{len(kept) - 1}\x00"
+    
+    def keep_embed(match):
+        open_tag, tag, body, close_tag = match.groups()
+        if tag.lower() == 'style':
+            body = minify_css(body)
+        elif 'src=' not in open_tag:
+            body = minify_js(body)
+        return keep(open_tag + body + close_tag)
+    
+    html = PRESERVE_PATTERN.sub(lambda m: keep(m.group(0)), html)
+    html = DESCRIPTION_PATTERN.sub(lambda m: m.group(1) + keep(m.group(2)), html)
+    html = EMBED_PATTERN.sub(keep_embed, html)
+    html = COMMENT_PATTERN.sub('', html)
+    html = re.sub(r'\s+', ' ', html)
+    html = BLOCK_TAG_PATTERN.sub(r'\1', html)
+    html = re.sub(r'\x00(\d+)\x00', lambda m: kept[int(m.group(1))], html.strip())
+    return html
+
+
+def finish_page(rel_path, html):
+    """Page text as it is written: minified when MINIFY_HTML is on"""
+    if MINIFY_HTML:
+        size = len(html.encode('utf-8'))
+        html = minify_html(html)
+        minify_report[rel_path.replace(os.sep, '/')] = [size, len(html.encode('utf-8'))]
+    return html
+
+
+def write_page(output_folder, rel_path, html):
+    """Write a generated page unless the file already has this content"""
+    path = os.path.join(output_folder, rel_path)
+    write_if_changed(path, finish_page(rel_path, html))
+    return path
+
+
+def write_dated_page(output_folder, rel_path, render, page_dates):
+    """Write a page that shows an "Updated" date.
+
+    render(date) returns the page html. The page keeps the date it was last
+    changed on (page_dates, {rel_path: date}) while the rest of its content is
+    the same, so an unchanged page is not rewritten every day.
+    """
+    path = os.path.join(output_folder, rel_path)
+    old_date = page_dates.get(rel_path)
+    if old_date and not write_if_changed(path, finish_page(rel_path, render(old_date))):
+        return path
+    today = datetime.now().strftime('%d %b %Y')
+    if today != old_date:
+        page_dates[rel_path] = today
+        write_page(output_folder, rel_path, render(today))
+    return path
+
+
+# =============================================================================
+# MAIN PAGE TEMPLATE
+# =============================================================================
+
+def get_main_template():
+    return '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">{base_tag}
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{page_title}</title>
+    <meta name="description" content="Adelyn Wong - Real Estate Matchmaker specializing in Setia Alam, Setia Eco Park, Eco Ardence & Klang. 12+ years experience.">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@400;500;600;700&family=Montserrat:wght@300;400;500;600&display=swap" rel="stylesheet">
+    <style>''' + get_critical_styles() + '''</style>
+    <link rel="stylesheet" href="''' + get_asset_url('site.css') + '''">
+    <link rel="stylesheet" href="''' + get_asset_url('main.css') + '''">
+</head>
+<body>
+    <nav class="navbar">
+        <div class="nav-container">
+            <a href="index.html" class="logo">ADELYN<span>WONG</span></a>
+            <ul class="nav-links">
+                <li><a href="index.html">Home</a></li>
+                <li><a href="{page_url}#listings">Listings</a></li>
+                <li><a href="{page_url}#contact">Contact</a></li>
+            </ul>
+            <button class="mobile-toggle">☰</button>
+        </div>
+    </nav>
+{hero_banner}
+    <section class="stats">
+        <div class="stats-container">
+            <div class="stat-item">
+                <div class="stat-number">12<span>+</span></div>
+                <div class="stat-label">Years Experience</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{total_properties}<span>+</span></div>
+                <div class="stat-label">Properties Managed</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{active_listings}</div>
+                <div class="stat-label">Active Listings</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{closed_deals}<span>+</span></div>
+                <div class="stat-label">Deals Closed</div>
+            </div>
+        </div>
+    </section>
+
+    <section class="listings" id="listings">
+        <div class="section-header">
+            <h2 class="section-title">Property Listings</h2>
+            <p class="section-subtitle">Find your perfect home in Setia Alam, Eco Park & Eco Ardence</p>
+        </div>
+        
+        <div class="filter-tabs">
+{filter_tabs}
+        </div>
+        
+        <div class="property-grid">
+{property_cards}
+        </div>
+{pagination}{card_feed}
+    </section>
+
+    <section class="contact" id="contact" style="padding: 4rem 2rem; background: var(--bg-cream);">
+        <div style="max-width: 800px; margin: 0 auto; text-align: center;">
+            <h2 class="section-title">Get In Touch</h2>
+            <p class="section-subtitle">Ready to find your dream home? Contact me today!</p>
+            <div style="display: flex; flex-wrap: wrap; justify-content: center; gap: 1rem; margin-top: 2rem;">
+                <a href="https://wa.me/{whatsapp}" style="display: inline-flex; align-items: center; gap: 0.5rem; padding: 1rem 2rem; border-radius: 50px; font-weight: 500; text-decoration: none; background: var(--green-whatsapp); color: white;" target="_blank">WhatsApp</a>
+                <a href="weixin://dl/chat?{wechat_id}" style="display: inline-flex; align-items: center; gap: 0.5rem; padding: 1rem 2rem; border-radius: 50px; font-weight: 500; text-decoration: none; background: #07c160; color: white;">WeChat: {wechat_id}</a>
+            </div>
+        </div>
+    </section>
+
+    <footer class="footer">
+        <div class="footer-logo">ADELYN<span>WONG</span></div>
+        <p class="footer-text">Connecting People to Real Estate Since 2012</p>
+        <p class="footer-ren">REN 03144 | CID Realtors</p>
+        <p class="footer-text" style="margin-top: 1rem; font-size: 0.75rem;">Updated: {generated_date}</p>
+    </footer>
+
+    <a href="https://wa.me/{whatsapp}" class="whatsapp-float" target="_blank">
+        <img src="''' + get_asset_url('whatsapp.svg') + '''" alt="WhatsApp" width="32" height="32">
+    </a>
+
+    <script src="''' + get_asset_url('main.js') + '''" defer></script>
+</body>
+</html>'''
+
+
+def render_hero_banner():
+    """Hero banner section of index.html, or '' if hero-banner.png was not processed"""
+    picture = render_site_image('hero-banner.png', 'Adelyn Wong Real Estate', '100vw', ' fetchpriority="high"')
+    if not picture:
+        return ''
+    return f'''
+    <!-- Hero Banner -->
+    <section class="hero" id="home">
+        <div class="hero-banner">
+            {picture}
+        </div>
+    </section>
+'''
+
+
+# =============================================================================
+# DETAIL PAGE TEMPLATE
+# =============================================================================
+
+def get_detail_template():
+    return '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{property_title} | Adelyn Wong</title>
+    <meta name="description" content="{meta_description}">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@400;500;600;700&family=Montserrat:wght@300;400;500;600&display=swap" rel="stylesheet">
+    <style>''' + get_critical_styles() + '''
+        .hero-more::after { content: '+{more_photos} photos'; }
     </style>
+    <link rel="stylesheet" href="''' + get_asset_url('site.css') + '''">
+    <link rel="stylesheet" href="''' + get_asset_url('detail.css') + '''">
 </head>
 <body>
     <nav class="navbar">
@@ -533,12 +1942,12 @@ def get_detail_template():
         
         <div class="hero-gallery">
             <div class="hero-main">
-                <img src="{hero_image}" alt="{property_title}" onclick="openLightbox(0)">
+                {hero_image}
             </div>
             <div class="hero-side">
-                <img src="{side_image_1}" alt="{property_title}" onclick="openLightbox(1)">
+                {side_image_1}
                 <div class="hero-more" onclick="openLightbox(2)">
-                    <img src="{side_image_2}" alt="{property_title}">
+                    {side_image_2}
                 </div>
             </div>
         </div>
@@ -562,7 +1971,7 @@ def get_detail_template():
         
         <div class="action-buttons">
             <a href="{whatsapp_link}" class="action-btn btn-whatsapp" target="_blank">
-                <svg width="24" height="24" viewBox="0 0 24 24" fill="currentColor"><path d="M17.472 14.382c-.297-.149-1.758-.867-2.03-.967-.273-.099-.471-.148-.67.15-.197.297-.767.966-.94 1.164-.173.199-.347.223-.644.075-.297-.15-1.255-.463-2.39-1.475-.883-.788-1.48-1.761-1.653-2.059-.173-.297-.018-.458.13-.606.134-.133.298-.347.446-.52.149-.174.198-.298.298-.497.099-.198.05-.371-.025-.52-.075-.149-.669-1.612-.916-2.207-.242-.579-.487-.5-.669-.51-.173-.008-.371-.01-.57-.01-.198 0-.52.074-.792.372-.272.297-1.04 1.016-1.04 2.479 0 1.462 1.065 2.875 1.213 3.074.149.198 2.096 3.2 5.077 4.487.709.306 1.262.489 1.694.625.712.227 1.36.195 1.871.118.571-.085 1.758-.719 2.006-1.413.248-.694.248-1.289.173-1.413-.074-.124-.272-.198-.57-.347m-5.421 7.403h-.004a9.87 9.87 0 01-5.031-1.378l-.361-.214-3.741.982.998-3.648-.235-.374a9.86 9.86 0 01-1.51-5.26c.001-5.45 4.436-9.884 9.888-9.884 2.64 0 5.122 1.03 6.988 2.898a9.825 9.825 0 012.893 6.994c-.003 5.45-4.437 9.884-9.885 9.884m8.413-18.297A11.815 11.815 0 0012.05 0C5.495 0 .16 5.335.157 11.892c0 2.096.547 4.142 1.588 5.945L.057 24l6.305-1.654a11.882 11.882 0 005.683 1.448h.005c6.554 0 11.89-5.335 11.893-11.893a11.821 11.821 0 00-3.48-8.413z"/></svg>
+                <img src="''' + get_asset_url('whatsapp.svg') + '''" alt="" width="24" height="24">
                 Enquire on WhatsApp
             </a>
             {tour_button}
@@ -621,7 +2030,7 @@ def get_detail_template():
     </footer>
 
     <a href="{whatsapp_link}" class="whatsapp-float" target="_blank">
-        <svg viewBox="0 0 24 24"><path d="M17.472 14.382c-.297-.149-1.758-.867-2.03-.967-.273-.099-.471-.148-.67.15-.197.297-.767.966-.94 1.164-.173.199-.347.223-.644.075-.297-.15-1.255-.463-2.39-1.475-.883-.788-1.48-1.761-1.653-2.059-.173-.297-.018-.458.13-.606.134-.133.298-.347.446-.52.149-.174.198-.298.298-.497.099-.198.05-.371-.025-.52-.075-.149-.669-1.612-.916-2.207-.242-.579-.487-.5-.669-.51-.173-.008-.371-.01-.57-.01-.198 0-.52.074-.792.372-.272.297-1.04 1.016-1.04 2.479 0 1.462 1.065 2.875 1.213 3.074.149.198 2.096 3.2 5.077 4.487.709.306 1.262.489 1.694.625.712.227 1.36.195 1.871.118.571-.085 1.758-.719 2.006-1.413.248-.694.248-1.289.173-1.413-.074-.124-.272-.198-.57-.347m-5.421 7.403h-.004a9.87 9.87 0 01-5.031-1.378l-.361-.214-3.741.982.998-3.648-.235-.374a9.86 9.86 0 01-1.51-5.26c.001-5.45 4.436-9.884 9.888-9.884 2.64 0 5.122 1.03 6.988 2.898a9.825 9.825 0 012.893 6.994c-.003 5.45-4.437 9.884-9.885 9.884m8.413-18.297A11.815 11.815 0 0012.05 0C5.495 0 .16 5.335.157 11.892c0 2.096.547 4.142 1.588 5.945L.057 24l6.305-1.654a11.882 11.882 0 005.683 1.448h.005c6.554 0 11.89-5.335 11.893-11.893a11.821 11.821 0 00-3.48-8.413z"/></svg>
+        <img src="''' + get_asset_url('whatsapp.svg') + '''" alt="WhatsApp" width="32" height="32">
     </a>
 
     <div class="lightbox" id="lightbox">
@@ -631,36 +2040,8 @@ def get_detail_template():
         <span class="lightbox-nav lightbox-next" onclick="changeSlide(1)">›</span>
     </div>
 
-    <script>
-        const photos = [{photos_json}];
-        let currentSlide = 0;
-
-        function openLightbox(index) {
-            currentSlide = index;
-            document.getElementById('lightbox-img').src = photos[currentSlide];
-            document.getElementById('lightbox').classList.add('active');
-            document.body.style.overflow = 'hidden';
-        }
-
-        function closeLightbox() {
-            document.getElementById('lightbox').classList.remove('active');
-            document.body.style.overflow = '';
-        }
-
-        function changeSlide(dir) {
-            currentSlide += dir;
-            if (currentSlide < 0) currentSlide = photos.length - 1;
-            if (currentSlide >= photos.length) currentSlide = 0;
-            document.getElementById('lightbox-img').src = photos[currentSlide];
-        }
-
-        document.addEventListener('keydown', (e) => {
-            if (!document.getElementById('lightbox').classList.contains('active')) return;
-            if (e.key === 'Escape') closeLightbox();
-            if (e.key === 'ArrowLeft') changeSlide(-1);
-            if (e.key === 'ArrowRight') changeSlide(1);
-        });
-    </script>
+    <script>const photos = [{photos_json}];</script>
+    <script src="''' + get_asset_url('detail.js') + '''" defer></script>
 </body>
 </html>'''
 
@@ -669,62 +2050,57 @@ def get_detail_template():
 # GENERATE PROPERTY CARD
 # =============================================================================
 
-def generate_property_card(row, output_folder):
-    prop_id = row.get('Property_ID', '')
-    location = row.get('Location', 'Unknown Location')
-    property_type = row.get('Property type', 'Property')
-    listing_type = row.get('Listing_Type', 'Rent')
-    beds = row.get('Bedrooms', 0)
-    baths = row.get('Bathrooms', 0)
-    sqft = row.get('Built-up', 0)
-    rent_price = row.get('Rent_RM', 0) if not pd.isna(row.get('Rent_RM', 0)) else row.get('Rental price', 0)
-    sale_price = row.get('Sale_RM', 0) if not pd.isna(row.get('Sale_RM', 0)) else row.get('Selling price', 0)
-    ads_status = row.get('Ads_Status', 'In Listing')
-    property_folder = row.get('property_folder', '')
-    
-    photos = copy_property_photos(property_folder, prop_id, output_folder, MAX_PHOTOS_PER_PROPERTY)
-    
-    if listing_type == 'Sale' and not pd.isna(sale_price) and sale_price > 0:
-        price_html = format_price(sale_price, 'Sale')
+def get_card_price(listing):
+    if listing.is_sale:
+        return format_price(listing.price, 'Sale')
+    return format_price(listing.price or 0, 'Rent')
+
+
+def get_type_filter(listing):
+    return 'sale' if listing.listing_type == 'Sale' else 'rent'
+
+
+def get_beds_label(listing):
+    return "Studio" if listing.beds == 'Studio' else f"{listing.beds} Beds"
+
+
+def generate_property_card(listing, output_folder, photos=None):
+    prop_id = listing.prop_id
+    location = listing.location
+    property_type = listing.property_type
+    
+    if photos is None:
+        photos = copy_property_photos(listing.property_folder, prop_id, output_folder, MAX_PHOTOS_PER_PROPERTY)
+    photos = photos[:MAX_PHOTOS_PER_PROPERTY]
+    
+    price_html = get_card_price(listing)
+    if listing.is_sale:
         type_badge = "For Sale"
         type_class = "for-sale"
     else:
-        price_html = format_price(rent_price, 'Rent')
         type_badge = "For Rent"
         type_class = ""
     
-    if pd.isna(beds):
-        beds_str = '0'
-    elif str(beds).lower() == 'studio':
-        beds_str = 'Studio'
-    else:
-        try:
-            beds_str = str(int(beds))
-        except:
-            beds_str = str(beds)
-    
-    baths_str = str(int(baths)) if not pd.isna(baths) and str(baths).replace('.','').isdigit() else '0'
-    sqft_str = f"{int(sqft):,}" if not pd.isna(sqft) and str(sqft).replace('.','').replace(',','').isdigit() and float(sqft) > 0 else "N/A"
+    baths_str = listing.baths
+    sqft_str = listing.sqft
     
-    location_filter = get_location_filter(location)
-    type_filter = 'sale' if listing_type == 'Sale' else 'rent'
+    location_filter = listing.location_filter
+    type_filter = get_type_filter(listing)
     
-    ads_lower = str(ads_status).lower()
-    if 'let out' in ads_lower:
+    is_closed = listing.is_closed
+    if listing.status == 'let out':
         status_badge = '<span class="badge badge-status let-out">LET OUT</span>'
-        is_closed = True
-    elif 'sold' in ads_lower:
+    elif listing.status == 'sold':
         status_badge = '<span class="badge badge-status let-out">SOLD</span>'
-        is_closed = True
     else:
         status_badge = '<span class="badge badge-status">AVAILABLE</span>'
-        is_closed = False
     
     if photos:
         photo_items = ""
         photo_dots = ""
         for i, photo in enumerate(photos):
-            photo_items += f'<div class="carousel-item"><img src="photos/{prop_id}/{photo}" alt="{location}" loading="lazy"></div>'
+            picture = render_thumbnail(photo, 'card', location, ' loading="lazy"')
+            photo_items += f'<div class="carousel-item">{picture}</div>'
             active_class = "active" if i == 0 else ""
             photo_dots += f'<span class="carousel-dot {active_class}"></span>'
         
@@ -740,15 +2116,12 @@ def generate_property_card(row, output_folder):
         icon = get_property_icon(property_type)
         image_html = f'<span class="icon">{icon}</span>'
     
-    if beds_str == 'Studio':
-        beds_display = "🛏️ Studio"
-    else:
-        beds_display = f"🛏️ {beds_str} Beds"
+    beds_display = f"🛏️ {get_beds_label(listing)}"
     
     if is_closed:
         card_link_start = f'<div class="property-card" data-type="{type_filter}" data-location="{location_filter}">'
         card_link_end = '</div>'
-        actions_html = '<button class="btn-closed" disabled>✓ ' + ('Let Out' if 'let out' in ads_lower else 'Sold') + '</button>'
+        actions_html = '<button class="btn-closed" disabled>✓ ' + ('Let Out' if listing.status == 'let out' else 'Sold') + '</button>'
     else:
         card_link_start = f'<a href="{prop_id}.html" class="property-card" data-type="{type_filter}" data-location="{location_filter}">'
         card_link_end = '</a>'
@@ -779,54 +2152,149 @@ def generate_property_card(row, output_folder):
             {card_link_end}'''
 
 
+def get_feed_record(listing, photos):
+    """Compact listings.json entry with the same data as generate_property_card"""
+    photos = photos[:MAX_PHOTOS_PER_PROPERTY]
+    thumbs = [photo.get('thumbs', {}).get('card') for photo in photos]
+    if photos and all(thumbs):
+        formats = [fmt for fmt in ('avif', 'webp') if all(fmt in thumb for thumb in thumbs)]
+        thumb_urls = [get_photo_url(photo, thumb['jpg']) for photo, thumb in zip(photos, thumbs)]
+        thumb_sizes = [[thumb['width'], thumb['height']] for thumb in thumbs]
+    else:
+        formats = []
+        thumb_urls = [get_photo_url(photo) for photo in photos]
+        thumb_sizes = [[photo.get('width'), photo.get('height')] for photo in photos]
+    colors = [photo.get('color') if PHOTO_PLACEHOLDER else None for photo in photos]
+    return {
+        'id': listing.prop_id,
+        'url': None if listing.is_closed else f"{listing.prop_id}.html",
+        'status': listing.status,
+        'type': get_type_filter(listing),
+        'is_sale': listing.is_sale,
+        'area': listing.location_filter,
+        'location': listing.location,
+        'title': listing.property_type,
+        'icon': get_property_icon(listing.property_type),
+        'price': get_card_price(listing),
+        'beds': get_beds_label(listing),
+        'baths': listing.baths,
+        'sqft': listing.sqft,
+        'thumbs': thumb_urls,
+        'sizes': thumb_sizes,
+        'colors': colors,
+        'formats': formats,
+    }
+
+
+def write_listings_feed(listings, listing_photos, output_folder):
+    feed = [get_feed_record(listing, listing_photos.get(listing.prop_id, [])) for listing in listings]
+    write_if_changed(os.path.join(output_folder, LISTINGS_FEED_FILE),
+                     json.dumps(feed, ensure_ascii=False, separators=(',', ':')))
+    return feed
+
+
+# =============================================================================
+# GENERATE FILTER PAGES
+# =============================================================================
+
+def get_filter_page_url(key, page):
+    """Site-relative URL of one page of a filter ('all' is index.html)"""
+    if key == 'all':
+        return 'index.html'
+    if page == 1:
+        return f"{key}/index.html"
+    return f"{key}/page-{page}.html"
+
+
+def render_filter_tabs(active):
+    tabs = [('all', 'All')] + FILTER_TABS
+    return '\n'.join(
+        f'            <a class="filter-tab{" active" if key == active else ""}" href="{get_filter_page_url(key, 1)}">{label}</a>'
+        for key, label in tabs
+    )
+
+
+def render_pagination(key, page, pages):
+    if pages <= 1:
+        return ''
+    prev_link = f'<a class="page-link" href="{get_filter_page_url(key, page - 1)}">‹ Prev</a>' if page > 1 else ''
+    next_link = f'<a class="page-link" href="{get_filter_page_url(key, page + 1)}">Next ›</a>' if page < pages else ''
+    return f'''        <nav class="pagination">
+            {prev_link}
+            <span class="page-info">Page {page} of {pages}</span>
+            {next_link}
+        </nav>'''
+
+
+def generate_filter_pages(cards, output_folder, page_values, page_dates):
+    """Write paginated card pages for every FILTER_TABS bucket.
+
+    cards is a list of (Listing, card html) in index order. Pages live one
+    folder down, so <base href="../"> keeps the card links site-relative;
+    the nav's #listings/#contact links are therefore prefixed with the page's own URL.
+    page_dates is passed to write_dated_page.
+    Returns the list of written paths, relative to output_folder.
+    """
+    written = []
+    template = get_compiled_template('main')
+    for key, label in FILTER_TABS:
+        matches = [html for listing, html in cards
+                   if ('sale' if listing.listing_type == 'Sale' else 'rent') == key or listing.location_filter == key]
+        pages = max(1, -(-len(matches) // FILTER_PAGE_SIZE))
+        os.makedirs(os.path.join(output_folder, key), exist_ok=True)
+        for page in range(1, pages + 1):
+            page_cards = matches[(page - 1) * FILTER_PAGE_SIZE:page * FILTER_PAGE_SIZE]
+            values = dict(
+                page_values,
+                base_tag='\n    <base href="../">',
+                page_url=get_filter_page_url(key, page),
+                page_title=f"{label} | Adelyn Wong" + (f" (Page {page})" if page > 1 else ""),
+                filter_tabs=render_filter_tabs(key),
+                property_cards='\n'.join(page_cards),
+                pagination=render_pagination(key, page, pages),
+                hero_banner='',
+                card_feed='',
+            )
+            path = get_filter_page_url(key, page)
+            write_dated_page(output_folder, path,
+                             lambda date, values=values: template.render(dict(values, generated_date=date)), page_dates)
+            written.append(path)
+    return written
+
+
 # =============================================================================
 # GENERATE DETAIL PAGE
 # =============================================================================
 
-def generate_detail_page(row, output_folder):
-    prop_id = row.get('Property_ID', '')
-    location = row.get('Location', 'Unknown Location')
-    property_type = row.get('Property type', 'Property')
-    listing_type = row.get('Listing_Type', 'Rent')
-    beds = row.get('Bedrooms', 0)
-    baths = row.get('Bathrooms', 0)
-    sqft = row.get('Built-up', 0)
-    rent_price = row.get('Rent_RM', 0) if not pd.isna(row.get('Rent_RM', 0)) else row.get('Rental price', 0)
-    sale_price = row.get('Sale_RM', 0) if not pd.isna(row.get('Sale_RM', 0)) else row.get('Selling price', 0)
-    furnishing = row.get('Furnishing', 'N/A')
-    tenure = row.get('Tenure', 'N/A')
-    tour_link = row.get('3D_link', '')
-    video_link = row.get('Video_Link', '')  # Ready for when you add this column
-    property_folder = row.get('property_folder', '')
+def generate_detail_page(listing, output_folder, photos=None, description=None):
+    prop_id = listing.prop_id
+    location = listing.location
+    property_type = listing.property_type
+    tour_link = listing.tour_link
+    video_link = listing.video_link  # Ready for when you add the Video_Link column
     
     # Read SEO description from seo.docx
-    description = read_seo_docx(property_folder)
+    if description is None:
+        description = read_seo_docx(listing.property_folder)
     if not description:
         description = f"Beautiful {property_type.lower()} located in {location}. Contact Adelyn for more details and to arrange a viewing."
     
-    photos = copy_property_photos(property_folder, prop_id, output_folder, MAX_PHOTOS_DETAIL_PAGE)
+    if photos is None:
+        photos = copy_property_photos(listing.property_folder, prop_id, output_folder, MAX_PHOTOS_DETAIL_PAGE)
+    photos = photos[:MAX_PHOTOS_DETAIL_PAGE]
     
     # Format values
-    if pd.isna(beds):
-        beds_str = '0'
-    elif str(beds).lower() == 'studio':
-        beds_str = 'Studio'
-    else:
-        try:
-            beds_str = str(int(beds))
-        except:
-            beds_str = str(beds)
-    
-    baths_str = str(int(baths)) if not pd.isna(baths) and str(baths).replace('.','').isdigit() else '0'
-    sqft_str = f"{int(sqft):,}" if not pd.isna(sqft) and str(sqft).replace('.','').replace(',','').isdigit() and float(sqft) > 0 else "N/A"
+    beds_str = listing.beds
+    baths_str = listing.baths
+    sqft_str = listing.sqft
     
-    if listing_type == 'Sale' and not pd.isna(sale_price) and sale_price > 0:
-        price = f"RM {int(sale_price):,}"
+    if listing.is_sale:
+        price = f"RM {int(listing.price):,}"
         price_label = ""
         badge_class = "badge-sale"
         listing_type_display = "For Sale"
     else:
-        price = f"RM {int(rent_price):,}" if not pd.isna(rent_price) and rent_price > 0 else "Contact"
+        price = f"RM {int(listing.price):,}" if listing.price else "Contact"
         price_label = "per month"
         badge_class = "badge-rent"
         listing_type_display = "For Rent"
@@ -837,17 +2305,17 @@ def generate_detail_page(row, output_folder):
     
     # Tour button (from 3D_link column)
     tour_button = ""
-    if tour_link and not pd.isna(tour_link) and str(tour_link).strip():
+    if tour_link:
         tour_button = f'<a href="{tour_link}" class="action-btn btn-tour" target="_blank">🔘 View 360° Tour</a>'
     
     # Video button (ready for future)
     video_button = ""
-    if video_link and not pd.isna(video_link) and str(video_link).strip():
+    if video_link:
         video_button = f'<a href="{video_link}" class="action-btn btn-video" target="_blank">▶️ Watch Video</a>'
     
     # Tour embed section
     tour_section = ""
-    if tour_link and not pd.isna(tour_link) and str(tour_link).strip():
+    if tour_link:
         tour_section = f'''
         <div class="tour-section">
             <h2>360° Virtual Tour</h2>
@@ -858,127 +2326,314 @@ def generate_detail_page(row, output_folder):
     
     # Hero images
     if len(photos) >= 3:
-        hero_image = f"photos/{prop_id}/{photos[0]}"
-        side_image_1 = f"photos/{prop_id}/{photos[1]}"
-        side_image_2 = f"photos/{prop_id}/{photos[2]}"
+        hero_photos = photos[:3]
         more_photos = len(photos) - 3
     elif len(photos) == 2:
-        hero_image = f"photos/{prop_id}/{photos[0]}"
-        side_image_1 = f"photos/{prop_id}/{photos[1]}"
-        side_image_2 = f"photos/{prop_id}/{photos[0]}"
+        hero_photos = [photos[0], photos[1], photos[0]]
         more_photos = 0
     elif len(photos) == 1:
-        hero_image = f"photos/{prop_id}/{photos[0]}"
-        side_image_1 = f"photos/{prop_id}/{photos[0]}"
-        side_image_2 = f"photos/{prop_id}/{photos[0]}"
+        hero_photos = [photos[0]] * 3
         more_photos = 0
     else:
-        hero_image = ""
-        side_image_1 = ""
-        side_image_2 = ""
+        hero_photos = [None] * 3
         more_photos = 0
+    property_title = f"{property_type} at {location}"
+    hero_image = render_picture(hero_photos[0], property_title, HERO_IMAGE_SIZES, ' onclick="openLightbox(0)"', blur=True)
+    side_image_1 = render_picture(hero_photos[1], property_title, SIDE_IMAGE_SIZES, ' onclick="openLightbox(1)"', blur=True)
+    side_image_2 = render_picture(hero_photos[2], property_title, SIDE_IMAGE_SIZES, blur=True)
     
     # Gallery images
     gallery_images = ""
     for i, photo in enumerate(photos):
-        gallery_images += f'<img src="photos/{prop_id}/{photo}" alt="{location}" onclick="openLightbox({i})" loading="lazy">'
+        gallery_images += render_thumbnail(photo, 'tile', location, f' onclick="openLightbox({i})" loading="lazy"')
     
-    photos_json = ", ".join([f'"photos/{prop_id}/{p}"' for p in photos])
+    photos_json = ", ".join([f'"{get_photo_url(p)}"' for p in photos])
     
     meta_description = f"{property_type} for {listing_type_display.lower()} in {location}. {beds_str} bedrooms, {baths_str} bathrooms, {sqft_str} sqft."
     
     # Build HTML
-    html = get_detail_template()
-    html = html.replace('{property_title}', f"{property_type} at {location}")
-    html = html.replace('{meta_description}', meta_description)
-    html = html.replace('{hero_image}', hero_image)
-    html = html.replace('{side_image_1}', side_image_1)
-    html = html.replace('{side_image_2}', side_image_2)
-    html = html.replace('{more_photos}', str(more_photos))
-    html = html.replace('{property_type}', property_type)
-    html = html.replace('{location}', location)
-    html = html.replace('{beds}', beds_str)
-    html = html.replace('{baths}', baths_str)
-    html = html.replace('{sqft}', sqft_str)
-    html = html.replace('{price}', price)
-    html = html.replace('{price_label}', price_label)
-    html = html.replace('{badge_class}', badge_class)
-    html = html.replace('{listing_type}', listing_type_display)
-    html = html.replace('{whatsapp_link}', whatsapp_link)
-    html = html.replace('{tour_button}', tour_button)
-    html = html.replace('{video_button}', video_button)
-    html = html.replace('{description}', description)
-    html = html.replace('{furnishing}', str(furnishing) if not pd.isna(furnishing) else 'N/A')
-    html = html.replace('{tenure}', str(tenure) if not pd.isna(tenure) else 'N/A')
-    html = html.replace('{tour_section}', tour_section)
-    html = html.replace('{gallery_images}', gallery_images)
-    html = html.replace('{photos_json}', photos_json)
-    
-    output_file = os.path.join(output_folder, f"{prop_id}.html")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
-    
-    return output_file
+    html = get_compiled_template('detail').render({
+        'property_title': property_title,
+        'meta_description': meta_description,
+        'hero_image': hero_image,
+        'side_image_1': side_image_1,
+        'side_image_2': side_image_2,
+        'more_photos': more_photos,
+        'property_type': property_type,
+        'location': location,
+        'beds': beds_str,
+        'baths': baths_str,
+        'sqft': sqft_str,
+        'price': price,
+        'price_label': price_label,
+        'badge_class': badge_class,
+        'listing_type': listing_type_display,
+        'whatsapp_link': whatsapp_link,
+        'tour_button': tour_button,
+        'video_button': video_button,
+        'description': description,
+        'furnishing': listing.furnishing,
+        'tenure': listing.tenure,
+        'tour_section': tour_section,
+        'gallery_images': gallery_images,
+        'photos_json': photos_json,
+    })
+    
+    return write_page(output_folder, f"{prop_id}.html", html)
 
 
 # =============================================================================
-# MAIN
+# PRECOMPRESSION
 # =============================================================================
 
-def generate_website():
-    print("=" * 60)
-    print("ADELYN WONG WEBSITE GENERATOR v4")
-    print("WITH PROPERTY DETAIL PAGES + SEO FROM seo.docx")
-    print("=" * 60)
-    
-    if not os.path.exists(MASTERBOOK_PATH):
-        print(f"\n❌ ERROR: Cannot find masterbook at:")
-        print(f"   {MASTERBOOK_PATH}")
-        input("\nPress Enter to exit...")
-        return
-    
-    if not HAS_DOCX:
-        print("\n⚠️ Installing python-docx...")
-        import subprocess
-        subprocess.run(['pip', 'install', 'python-docx', '--break-system-packages'], capture_output=True)
-        print("   Please run the script again.")
-        input("\nPress Enter to exit...")
-        return
-    
-    if not HAS_PIL:
-        print("\n⚠️ Installing Pillow for photo compression...")
-        import subprocess
-        subprocess.run(['pip', 'install', 'Pillow', '--break-system-packages'], capture_output=True)
-        print("   Please run the script again.")
-        input("\nPress Enter to exit...")
-        return
+def get_precompress_formats():
+    formats = ['gz']
+    if HAS_BROTLI:
+        formats.append('br')
+    return formats
+
+
+def compress_output(path, formats):
+    """Write .gz/.br next to path at maximum compression"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    for fmt in formats:
+        if fmt == 'gz':
+            packed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            import brotli
+            packed = brotli.compress(data, quality=11)
+        write_if_changed(f"{path}.{fmt}", packed)
+
+
+def precompress_outputs(output_folder, paths, partial=False):
+    """Compress the given text outputs (relative paths), skipping unchanged files.
+
+    A file is unchanged when its sha256 matches the one recorded in
+    PRECOMPRESS_CACHE_FILE and all of its compressed siblings exist. With
+    partial=True the recorded hashes of other files are kept.
+    Returns (compressed, skipped) counts.
+    """
+    formats = get_precompress_formats()
+    old_hashes = load_cache_file(output_folder, PRECOMPRESS_CACHE_FILE)
+    new_hashes = dict(old_hashes) if partial else {}
+    pending = []
+    skipped = 0
+    for rel_path in paths:
+        path = os.path.join(output_folder, rel_path)
+        if not os.path.exists(path) or os.path.getsize(path) < PRECOMPRESS_MIN_SIZE:
+            continue
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        key = rel_path.replace(os.sep, '/')
+        new_hashes[key] = digest
+        if old_hashes.get(key) == digest and all(os.path.exists(f"{path}.{fmt}") for fmt in formats):
+            skipped += 1
+        else:
+            pending.append(path)
     
-    if COMPRESS_PHOTOS:
-        print(f"\n📷 Photo compression: ENABLED")
-        print(f"   Max size: {MAX_PHOTO_WIDTH}x{MAX_PHOTO_HEIGHT}, Quality: {JPEG_QUALITY}%")
+    workers = PRECOMPRESS_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda path: compress_output(path, formats), pending))
     
-    output_folder = os.path.abspath(OUTPUT_FOLDER)
-    os.makedirs(os.path.join(output_folder, 'photos'), exist_ok=True)
+    save_cache_file(output_folder, PRECOMPRESS_CACHE_FILE, new_hashes)
+    return len(pending), skipped
+
+
+# =============================================================================
+# SWEEP
+# =============================================================================
+
+# Root files the generator writes; anything else in OUTPUT_FOLDER (scripts, CNAME, ...) is never swept
+GENERATED_ROOT_PATTERN = re.compile(r'^(PROP-[^/]+\.html|index\.html|listings\.json)(\.gz|\.br)?$')
+FILTER_PAGE_PATTERN = re.compile(r'^(index|page-\d+)\.html(\.gz|\.br)?$')
+
+
+def get_produced_outputs(text_outputs, listing_photos):
+    """Relative paths of everything this build wrote (the sweep's mark set)"""
+    produced = set(text_outputs)
+    if PRECOMPRESS_OUTPUT:
+        produced |= {f"{path}.{fmt}" for path in text_outputs for fmt in get_precompress_formats()}
+    for photos in listing_photos.values():
+        for photo in photos:
+            produced |= {f"{photo['folder']}/{file_name}" for file_name in photo['files']}
+    for image in site_images.values():
+        produced |= set(image['files'])
+    return produced
+
+
+def find_stale_outputs(output_folder, produced, keep_dirs):
+    """Generated-looking files under output_folder that are not in produced"""
+    candidates = [name for name in os.listdir(output_folder) if GENERATED_ROOT_PATTERN.match(name)]
+    for key, _ in FILTER_TABS:
+        folder = os.path.join(output_folder, key)
+        if os.path.isdir(folder):
+            candidates += [f"{key}/{name}" for name in os.listdir(folder) if FILTER_PAGE_PATTERN.match(name)]
+    for top in (ASSETS_FOLDER, 'photos'):
+        for folder, _, files in os.walk(os.path.join(output_folder, top)):
+            rel_folder = os.path.relpath(folder, output_folder).replace(os.sep, '/')
+            if any(rel_folder == kept or rel_folder.startswith(kept + '/') for kept in keep_dirs):
+                continue
+            candidates += [f"{rel_folder}/{name}" for name in files]
+    return sorted(path for path in candidates if path not in produced)
+
+
+def sweep_outputs(output_folder, produced, keep_dirs=(), delete=False):
+    """Report (and with delete=True remove) outputs the current build did not produce.
+
+    Photo folders in keep_dirs are left alone, e.g. when a photo failed to
+    encode and its old files are still the best copy. Returns counters for
+    the build report.
+    """
+    stale = find_stale_outputs(output_folder, produced, keep_dirs)
+    sizes = {path: os.path.getsize(os.path.join(output_folder, path)) for path in stale}
+    freed = sum(sizes.values())
+    save_cache_file(output_folder, SWEEP_REPORT_FILE, {'deleted': delete, 'bytes': freed, 'files': sizes})
+    if not stale:
+        return {'stale_files': 0, 'stale_bytes': 0, 'deleted': delete}
     
-    print(f"\n📖 Reading masterbook...")
+    print(f"\n🧹 {'Removing' if delete else 'Found'} {len(stale)} stale files ({freed / 1024 / 1024:.1f} MB)")
+    for path in stale[:10]:
+        print(f"   {path}")
+    if len(stale) > 10:
+        print(f"   ... and {len(stale) - 10} more (see {BUILD_CACHE_FOLDER}/{SWEEP_REPORT_FILE})")
+    if delete:
+        for path in stale:
+            os.remove(os.path.join(output_folder, path))
+        for folder, _, _ in sorted(os.walk(os.path.join(output_folder, 'photos')), reverse=True):
+            if folder != os.path.join(output_folder, 'photos') and not os.listdir(folder):
+                os.rmdir(folder)
+    else:
+        print("   Dry run, nothing deleted. Run with --sweep to delete them.")
+    return {'stale_files': len(stale), 'stale_bytes': freed, 'deleted': delete}
+
+
+# =============================================================================
+# DEPLOY MANIFEST
+# =============================================================================
+
+def write_deploy_manifest(output_folder, produced):
+    """Hash every output and save what was added, changed or removed since the last full build.
+
+    DEPLOY_MANIFEST_FILE maps each path to [size, mtime_ns, sha256]. A file
+    whose size and mtime are unchanged reuses its recorded hash, so only
+    rewritten files are read. DEPLOY_DELTA_FILE holds
+    {'added': {path: sha256}, 'changed': {path: sha256}, 'removed': [paths]}.
+    Stale outputs that are still on disk (the sweep is a dry run by default)
+    stay in the manifest and only count as removed once they are deleted.
+    """
+    old_files = load_cache_file(output_folder, DEPLOY_MANIFEST_FILE)
+    files = {}
+    hashed = 0
+    for rel_path in sorted(produced):
+        path = os.path.join(output_folder, rel_path)
+        signature = get_file_signature(path)
+        if signature is None:
+            continue
+        entry = old_files.get(rel_path)
+        if entry and entry[:2] == signature:
+            files[rel_path] = entry
+        else:
+            files[rel_path] = signature + [hash_file(path)]
+            hashed += 1
+    for rel_path in old_files.keys() - files.keys():
+        if os.path.exists(os.path.join(output_folder, rel_path)):
+            files[rel_path] = old_files[rel_path]
     
+    delta = {
+        'added': {path: entry[2] for path, entry in files.items() if path not in old_files},
+        'changed': {path: entry[2] for path, entry in files.items()
+                    if path in old_files and old_files[path][2] != entry[2]},
+        'removed': sorted(old_files.keys() - files.keys()),
+    }
+    save_cache_file(output_folder, DEPLOY_MANIFEST_FILE, files)
+    save_cache_file(output_folder, DEPLOY_DELTA_FILE, delta)
+    print(f"\n📦 Deploy delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+          f"{len(delta['removed'])} removed ({BUILD_CACHE_FOLDER}/{DEPLOY_DELTA_FILE})")
+    return {'files': len(files), 'hashed': hashed, 'added': len(delta['added']),
+            'changed': len(delta['changed']), 'removed': len(delta['removed'])}
+
+
+# =============================================================================
+# BUILD REPORT
+# =============================================================================
+
+# Filled in by the build stages and saved as BUILD_REPORT_FILE:
+# {'mode', 'started', 'seconds', 'stages': [{'name', 'seconds', ...}], 'listings': {prop_id: {...}}}
+build_report = {}
+
+
+def start_build_report(mode):
+    build_report.clear()
+    build_report.update(mode=mode, started=datetime.now().isoformat(timespec='seconds'),
+                        seconds=None, stages=[], listings={})
+    build_report['_start'] = time.perf_counter()
+
+
+@contextmanager
+def timed_stage(name):
+    """Time a build stage; the yielded dict takes extra counters for the report"""
+    entry = {'name': name}
+    start = time.perf_counter()
     try:
-        props = pd.read_excel(MASTERBOOK_PATH, sheet_name='Properties')
-        active = pd.read_excel(MASTERBOOK_PATH, sheet_name='Active Listing')
-        print(f"   ✅ Properties: {len(props)} rows")
-        print(f"   ✅ Active Listing: {len(active)} rows")
-        
-        try:
-            commercial = pd.read_excel(MASTERBOOK_PATH, sheet_name='Commercial_Properties')
-            print(f"   ✅ Commercial: {len(commercial)} rows")
-        except:
-            commercial = pd.DataFrame()
-    except Exception as e:
-        print(f"\n❌ ERROR: {e}")
-        input("\nPress Enter to exit...")
-        return
+        yield entry
+    finally:
+        entry['seconds'] = round(time.perf_counter() - start, 4)
+        build_report.setdefault('stages', []).append(entry)
+
+
+def record_listing(prop_id, **fields):
+    listing = build_report.setdefault('listings', {}).setdefault(prop_id, {})
+    for key, value in fields.items():
+        listing[key] = round(value, 4) if isinstance(value, float) else value
+
+
+def save_build_report(output_folder):
+    report = {key: value for key, value in build_report.items() if not key.startswith('_')}
+    report['seconds'] = round(time.perf_counter() - build_report['_start'], 4)
+    save_cache_file(output_folder, BUILD_REPORT_FILE, report)
+    print(f"\n⏱️ Build took {report['seconds']:.1f}s")
+    for stage in sorted(report['stages'], key=lambda stage: -stage['seconds'])[:5]:
+        print(f"   {stage['name']:<20} {stage['seconds']:8.2f}s")
+    print(f"   Report: {os.path.join(BUILD_CACHE_FOLDER, BUILD_REPORT_FILE)}")
+
+
+# =============================================================================
+# BUILD STAGES
+# =============================================================================
+
+def load_listings(output_folder):
+    """Read and merge the masterbook into Listing records.
+
+    Returns {'available', 'closed', 'stats'}; stats holds the page counters.
+    Raises ValueError if a required sheet is missing.
+    """
+    print(f"\n📖 Reading masterbook...")
+    with timed_stage('read_masterbook') as stage:
+        sheets, from_cache = read_masterbook(output_folder)
+        stage.update(input_bytes=os.path.getsize(MASTERBOOK_PATH), cache_hit=from_cache)
+    if from_cache:
+        print("   ✅ Unchanged since last run, using cached sheets")
+    for name in ('Properties', 'Active Listing'):
+        if name not in sheets:
+            raise ValueError(f"Worksheet named '{name}' not found")
+    props = sheets['Properties']
+    active = sheets['Active Listing']
+    commercial = sheets.get('Commercial_Properties', pd.DataFrame())
+    print(f"   ✅ Properties: {len(props)} rows")
+    print(f"   ✅ Active Listing: {len(active)} rows")
+    if len(commercial):
+        print(f"   ✅ Commercial: {len(commercial)} rows")
     
     print("\n🔗 Merging data...")
+    with timed_stage('merge') as stage:
+        data = merge_listings(props, active, commercial)
+        stage['listings'] = len(data['available']) + len(data['closed'])
+    return data
+
+
+def merge_listings(props, active, commercial):
+    """Join active listings to their property rows and split available/closed"""
     residential_active = active[active['Category'] == 'Residential']
     commercial_active = active[active['Category'] == 'Commercial']
     
@@ -997,57 +2652,512 @@ def generate_website():
     available = merged[~merged['Ads_Status'].str.lower().str.contains('let out|sold', na=False)]
     closed = merged[merged['Ads_Status'].str.lower().str.contains('let out|sold', na=False)]
     
-    total_properties = len(props) + len(commercial)
-    active_count = len(available)
-    closed_count = len(closed)
+    stats = {
+        'total_properties': len(props) + len(commercial),
+        'active_listings': len(available),
+        'closed_deals': len(closed),
+    }
+    print(f"\n📊 Stats: {stats['active_listings']} available, {stats['closed_deals']} closed")
+    
+    
+    return {
+        'available': normalize_listings(available),
+        'closed': normalize_listings(closed.head(10)),
+        'stats': stats,
+    }
+
+
+def process_photos(listings, output_folder, failed=None):
+    """Encode photos for the given listings. Returns {prop_id: [photo records]}
+
+    IDs of listings with a photo that failed are added to the failed set.
+    """
+    print(f"\n🖼️ Processing photos ({get_photo_workers()} workers)...")
+    with timed_stage('photos') as stage:
+        photo_cache = load_photo_cache(output_folder)
+        source_hashes = load_cache_file(output_folder, SOURCE_HASH_CACHE_FILE) if PHOTO_STORE else None
+        photo_jobs = []
+        for listing in listings:
+            photo_jobs += plan_listing_photos(listing, output_folder, source_hashes)
+        photo_results = run_photo_jobs(photo_jobs, photo_cache)
+        save_photo_cache(output_folder, photo_cache)
+        if PHOTO_STORE:
+            save_cache_file(output_folder, SOURCE_HASH_CACHE_FILE, source_hashes)
+            unique = {job['cache_id'] for job in photo_jobs}
+            stage['unique_photos'] = len(unique)
+            print(f"   ✅ {len(photo_jobs)} listing photos stored as {len(unique)} unique files")
+    
+    listing_photos = {listing.prop_id: [] for listing in listings}
+    photo_count = 0
+    error_count = 0
+    for prop_id, result in photo_results.items():
+        listing_photos[prop_id] = result['photos']
+        photo_count += len(result['photos'])
+        record_listing(prop_id, photos=len(result['photos']), photo_cache_hits=result['cache_hits'],
+                       photo_seconds=result['seconds'], photo_input_bytes=result['input_bytes'],
+                       photo_output_bytes=result['output_bytes'])
+        for photo_name, error in result['errors']:
+            print(f"   ⚠️ {prop_id}/{photo_name}: {error}")
+            error_count += 1
+        if result['errors'] and failed is not None:
+            failed.add(prop_id)
+    stage.update(
+        photos=photo_count,
+        errors=error_count,
+        cache_hits=sum(result['cache_hits'] for result in photo_results.values()),
+        input_bytes=sum(result['input_bytes'] for result in photo_results.values()),
+        output_bytes=sum(result['output_bytes'] for result in photo_results.values()),
+    )
+    print(f"   ✅ {photo_count} photos")
+    if error_count:
+        print(f"   ⚠️ {error_count} photos failed")
+    
+    quality = get_quality_summary(photo for photos in listing_photos.values() for photo in photos)
+    if quality:
+        stage['quality'] = quality
+        sizes = lambda p: " / ".join(f"{p[key] // 1024}KB" for key in ('p10', 'p50', 'p90'))
+        print(f"   📉 JPEG p10/p50/p90: {sizes(quality['source_bytes'])} → {sizes(quality['jpeg_bytes'])}"
+              f" ({quality['saved_percent']}% smaller)")
+        print("   📉 Qualities: " + ", ".join(f"q{q}×{n}" for q, n in quality['qualities'].items()))
+    return listing_photos
+
+
+def build_detail_pages(listings, listing_photos, output_folder, partial=False):
+    """Write detail pages whose fingerprint changed. Returns the pages' relative paths.
+
+    With partial=True only the given listings are considered and the stored
+    fingerprints and seo.docx texts of every other listing are kept.
+    """
+    print("\n📄 Generating detail pages (with SEO from seo.docx)...")
+    with timed_stage('detail_pages') as stage:
+        pages = write_detail_pages(listings, listing_photos, output_folder, partial, stage)
+    print(f"   ✅ {len(pages)} detail pages ({stage['skipped']} unchanged, skipped)")
+    print(f"   ✅ {stage['seo_found']} with seo.docx found")
+    return pages
+
+
+def write_detail_pages(listings, listing_photos, output_folder, partial, stage):
+    build_manifest = load_cache_file(output_folder, BUILD_MANIFEST_FILE)
+    old_fingerprints = build_manifest.get('detail_pages', {})
+    new_fingerprints = dict(old_fingerprints) if partial else {}
+    seo_cache = load_cache_file(output_folder, SEO_CACHE_FILE)
+    seo_paths = set()
+    pages = []
+    skipped_count = 0
+    seo_count = 0
+    seo_hits = 0
+    output_bytes = 0
+    for listing in listings:
+        prop_id = listing.prop_id
+        seo_path = get_seo_path(listing.property_folder)
+        seo_signature = get_file_signature(seo_path) if seo_path else None
+        if seo_signature:
+            seo_count += 1
+            seo_paths.add(seo_path)
+        photos = listing_photos.get(prop_id, [])
+        fingerprint = get_detail_fingerprint(listing, photos, seo_signature)
+        new_fingerprints[prop_id] = fingerprint
+        pages.append(f"{prop_id}.html")
+        output_file = os.path.join(output_folder, f"{prop_id}.html")
+        if old_fingerprints.get(prop_id) == fingerprint and os.path.exists(output_file):
+            skipped_count += 1
+            record_listing(prop_id, detail_skipped=True)
+            continue
+        start = time.perf_counter()
+        seo_hit = seo_signature is not None and seo_cache.get(seo_path, {}).get('signature') == seo_signature
+        seo_hits += seo_hit
+        description = get_seo_text(seo_path, seo_signature, seo_cache)
+        seo_seconds = time.perf_counter() - start
+        generate_detail_page(listing, output_folder, photos, description)
+        page_bytes = os.path.getsize(output_file)
+        output_bytes += page_bytes
+        record_listing(prop_id, detail_skipped=False, seo_cache_hit=seo_hit, seo_seconds=seo_seconds,
+                       detail_seconds=time.perf_counter() - start, detail_bytes=page_bytes)
+    build_manifest['detail_pages'] = new_fingerprints
+    save_cache_file(output_folder, BUILD_MANIFEST_FILE, build_manifest)
+    if not partial:
+        seo_cache = {path: entry for path, entry in seo_cache.items() if path in seo_paths}
+    save_cache_file(output_folder, SEO_CACHE_FILE, seo_cache)
+    stage.update(pages=len(pages), skipped=skipped_count, seo_found=seo_count, seo_cache_hits=seo_hits,
+                 output_bytes=output_bytes)
+    return pages
+
+
+def build_index_pages(listings, cards, listing_photos, stats, output_folder):
+    """Write index.html, listings.json and the filter pages. Returns their relative paths.
+
+    cards is the card html of each listing, by position (a Property_ID can
+    appear on more than one masterbook row).
+    """
+    print("\n📝 Building main page...")
+    with timed_stage('index_pages') as stage:
+        pages = write_index_pages(listings, cards, listing_photos, stats, output_folder)
+        stage.update(pages=len(pages), output_bytes=sum(os.path.getsize(os.path.join(output_folder, path)) for path in pages))
+    print(f"   ✅ {len(pages) - 2} filter pages ({FILTER_PAGE_SIZE} cards per page)")
+    return pages
+
+
+def write_index_pages(listings, cards, listing_photos, stats, output_folder):
+    page_values = dict(stats, whatsapp=WHATSAPP, wechat_id=WECHAT_ID)
+    build_manifest = load_cache_file(output_folder, BUILD_MANIFEST_FILE)
+    page_dates = build_manifest.get('page_dates', {})
+    property_cards = list(zip(listings, cards))
+    write_listings_feed(listings, listing_photos, output_folder)
+    index_cards = [card for _, card in property_cards]
+    card_feed = ''
+    if INDEX_MODE == 'virtual' and len(index_cards) > INDEX_INITIAL_CARDS:
+        index_cards = index_cards[:INDEX_INITIAL_CARDS]
+        card_feed = (f'        <div class="card-feed" data-feed="{LISTINGS_FEED_FILE}" data-skip="{INDEX_INITIAL_CARDS}" '
+                     f'data-batch="{INDEX_INITIAL_CARDS}"></div>\n'
+                     f'        <script src="{get_asset_url("feed.js")}" defer></script>')
+    values = dict(
+        page_values,
+        base_tag='',
+        page_url='',
+        page_title='Adelyn Wong | Real Estate Matchmaker Since 2012',
+        filter_tabs=render_filter_tabs('all'),
+        property_cards='\n'.join(index_cards),
+        pagination='',
+        hero_banner=render_hero_banner(),
+        card_feed=card_feed,
+    )
+    template = get_compiled_template('main')
+    write_dated_page(output_folder, 'index.html',
+                     lambda date: template.render(dict(values, generated_date=date)), page_dates)
+    filter_pages = generate_filter_pages(property_cards, output_folder, page_values, page_dates)
+    
+    pages = ['index.html'] + filter_pages
+    build_manifest['page_dates'] = {path: page_dates[path] for path in pages if path in page_dates}
+    save_cache_file(output_folder, BUILD_MANIFEST_FILE, build_manifest)
+    return ['index.html', LISTINGS_FEED_FILE] + filter_pages
+
+
+def finish_text_outputs(output_folder, text_outputs, partial=False):
+    """Minify report and precompression for the text files written this build"""
+    if MINIFY_HTML and minify_report:
+        before = sum(size for size, _ in minify_report.values())
+        after = sum(size for _, size in minify_report.values())
+        print(f"\n✂️ Minified {len(minify_report)} pages: {before:,} → {after:,} bytes ({before - after:,} saved)")
+        for path, (size, minified) in sorted(minify_report.items(), key=lambda item: item[1][1] - item[1][0])[:5]:
+            print(f"   {path}: -{size - minified:,} bytes ({(size - minified) / size:.0%})")
+        save_cache_file(output_folder, MINIFY_REPORT_FILE, minify_report)
+    
+    if PRECOMPRESS_OUTPUT:
+        print(f"\n🗜️ Precompressing text files ({', '.join(get_precompress_formats())})...")
+        with timed_stage('precompress') as stage:
+            compressed, unchanged = precompress_outputs(output_folder, text_outputs, partial)
+            stage.update(compressed=compressed, skipped=unchanged)
+        print(f"   ✅ {compressed} compressed ({unchanged} unchanged, skipped)")
+        if not HAS_BROTLI:
+            print("   ⚠️ brotli not installed, .br skipped. Run: pip install brotli")
+
+
+def generate_cards(listings, listing_photos, output_folder):
+    """Card html for each of the given listings, in the same order"""
+    cards = []
+    for listing in listings:
+        start = time.perf_counter()
+        cards.append(generate_property_card(listing, output_folder, listing_photos[listing.prop_id]))
+        record_listing(listing.prop_id, card_seconds=time.perf_counter() - start)
+    return cards
+
+
+def build_website(output_folder, sweep=False):
+    """Run every build stage. Returns the build state that watch mode updates in place.
+
+    The state holds the listings, their photo records and cards, so a later
+    rebuild_website() only has to redo the listings that changed. Stale
+    outputs are reported, and deleted when sweep is True.
+    """
+    os.makedirs(os.path.join(output_folder, 'photos'), exist_ok=True)
+    minify_report.clear()
+    start_build_report('full')
+    with timed_stage('assets'):
+        write_site_assets(output_folder)
+    with timed_stage('site_images') as stage:
+        encoded, unchanged, missing = process_site_images(output_folder)
+        stage.update(encoded=encoded, skipped=unchanged, missing=missing)
+    if SITE_IMAGES:
+        print(f"\n🌄 Site images: {encoded} encoded ({unchanged} unchanged, skipped)")
+        if not HAS_PIL:
+            print("   ⚠️ Pillow not installed, site images skipped")
+        elif missing:
+            print(f"   ⚠️ {missing} not found in {SITE_IMAGES_FOLDER or output_folder}")
+    
+    data = load_listings(output_folder)
+    listings = data['available'] + data['closed']
     
-    print(f"\n📊 Stats: {active_count} available, {closed_count} closed")
+    # Process photos once per listing (shared by cards and detail pages)
+    failed_photos = set()
+    listing_photos = process_photos(listings, output_folder, failed_photos)
+    if PHOTO_DUPLICATE_REPORT and HAS_PIL:
+        with timed_stage('photo_duplicates') as stage:
+            duplicates = find_near_duplicates(listing_photos, output_folder)
+            save_cache_file(output_folder, PHOTO_DUPLICATES_FILE, duplicates)
+            stage['pairs'] = len(duplicates)
+        print(f"   🔍 {len(duplicates)} near-duplicate photo pairs ({BUILD_CACHE_FOLDER}/{PHOTO_DUPLICATES_FILE})")
+        for pair in duplicates[:5]:
+            print(f"      {' ~ '.join(pair['photos'])} ({', '.join(pair['listings'])})")
     
     # Generate cards
     print("\n📷 Generating property cards...")
-    property_cards = []
+    with timed_stage('cards') as stage:
+        cards = generate_cards(listings, listing_photos, output_folder)
+        stage['cards'] = len(cards)
+    print(f"   ✅ {len(cards)} cards")
     
-    for _, row in available.iterrows():
-        card = generate_property_card(row, output_folder)
-        property_cards.append(card)
+    detail_pages = build_detail_pages(data['available'], listing_photos, output_folder)
+    index_pages = build_index_pages(listings, cards, listing_photos, data['stats'], output_folder)
     
-    for _, row in closed.head(10).iterrows():
-        card = generate_property_card(row, output_folder)
-        property_cards.append(card)
+    assets = [path for path, _ in get_site_assets().values()]
+    finish_text_outputs(output_folder, index_pages + detail_pages + assets)
     
-    print(f"   ✅ {len(property_cards)} cards")
+    produced = get_produced_outputs(index_pages + detail_pages + assets, listing_photos)
+    keep_dirs = {f"photos/{prop_id}" for prop_id in failed_photos}
+    with timed_stage('sweep') as stage:
+        stage.update(sweep_outputs(output_folder, produced, keep_dirs, delete=sweep))
+    with timed_stage('deploy_manifest') as stage:
+        stage.update(write_deploy_manifest(output_folder, produced))
+    save_build_report(output_folder)
     
-    # Generate detail pages
-    print("\n📄 Generating detail pages (with SEO from seo.docx)...")
-    detail_count = 0
-    seo_count = 0
-    for _, row in available.iterrows():
-        property_folder = row.get('property_folder', '')
-        seo_path = os.path.join(PHOTO_BASE_PATH, str(property_folder), 'seo.docx') if property_folder else ''
-        if seo_path and os.path.exists(seo_path):
-            seo_count += 1
-        generate_detail_page(row, output_folder)
-        detail_count += 1
-    print(f"   ✅ {detail_count} detail pages")
-    print(f"   ✅ {seo_count} with seo.docx found")
+    return dict(data, listings=listings, listing_photos=listing_photos, cards=cards)
+
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+def get_folder_signature(folder):
+    """Sorted (name, size, mtime) of the files in a folder, or None if it is missing"""
+    try:
+        with os.scandir(folder) as entries:
+            files = [(e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in entries if e.is_file()]
+    except OSError:
+        return None
+    return sorted(files)
+
+
+def get_source_snapshot(listings):
+    """{'masterbook' or prop_id: signature} of every source a build reads"""
+    snapshot = {'masterbook': get_file_signature(MASTERBOOK_PATH)}
+    for listing in listings:
+        if not listing.property_folder:
+            continue
+        folder = os.path.join(PHOTO_BASE_PATH, listing.property_folder)
+        snapshot[listing.prop_id] = [
+            get_file_signature(os.path.join(folder, 'seo.docx')),
+            get_folder_signature(os.path.join(folder, 'watermark')),
+        ]
+    return snapshot
+
+
+def get_row_keys(listings):
+    """(Property_ID, occurrence) of each listing, to match rows across masterbook edits.
+
+    Unlike list positions these survive inserted, deleted and reordered rows,
+    and they keep the rows of a repeated Property_ID apart.
+    """
+    seen = {}
+    keys = []
+    for listing in listings:
+        occurrence = seen.get(listing.prop_id, 0)
+        seen[listing.prop_id] = occurrence + 1
+        keys.append((listing.prop_id, occurrence))
+    return keys
+
+
+def print_unlisted_outputs(output_folder, removed, closed):
+    """Point out outputs of listings that left the masterbook (or closed) during watch mode.
+
+    Watch mode never deletes; they stay live until a full build with --sweep.
+    """
+    stale = [f"{prop_id}.html" for prop_id in sorted(closed)] + [f"photos/{prop_id}" for prop_id in sorted(removed)]
+    stale = [path for path in stale if os.path.exists(os.path.join(output_folder, path))]
+    if stale:
+        print(f"\n🧹 {len(stale)} outputs no longer listed (run a full build with --sweep to remove them):")
+        for path in stale:
+            print(f"   {path}")
+
+
+def rebuild_website(state, changed, output_folder):
+    """Redo only the listings affected by the changed snapshot keys.
+
+    A masterbook change rereads the sheets and affects every listing whose
+    fields changed (plus added and removed ones); rows are matched with
+    get_row_keys. The index and filter pages
+    are always rewritten since they show every card.
+    Returns a new state and the affected Property_IDs; the given state is
+    left untouched, so it is still usable if the rebuild raises.
+    """
+    minify_report.clear()
+    start_build_report('watch')
+    state = dict(state, listing_photos=dict(state['listing_photos']), cards=list(state['cards']))
+    affected = set(changed) - {'masterbook'}
+    if 'masterbook' in changed:
+        old_rows = {key: (listing.to_dict(), card) for key, listing, card
+                    in zip(get_row_keys(state['listings']), state['listings'], state['cards'])}
+        old_ids = {listing.prop_id for listing in state['listings']}
+        old_available = {listing.prop_id for listing in state['available']}
+        data = load_listings(output_folder)
+        state.update(data, listings=data['available'] + data['closed'])
+        cards = []
+        for key, listing in zip(get_row_keys(state['listings']), state['listings']):
+            fields, card = old_rows.get(key, (None, None))
+            if fields != listing.to_dict():
+                affected.add(listing.prop_id)
+                card = None
+            cards.append(card)
+        state['cards'] = cards
+        removed = old_ids - {listing.prop_id for listing in state['listings']}
+        affected |= removed
+        for prop_id in removed:
+            state['listing_photos'].pop(prop_id, None)
+        print_unlisted_outputs(output_folder, removed, old_available - {listing.prop_id for listing in state['available']})
     
-    # Build main page
-    print("\n📝 Building main page...")
-    html = get_main_template()
-    html = html.replace('{whatsapp}', WHATSAPP)
-    html = html.replace('{wechat_id}', WECHAT_ID)
-    html = html.replace('{total_properties}', str(total_properties))
-    html = html.replace('{active_listings}', str(active_count))
-    html = html.replace('{closed_deals}', str(closed_count))
-    html = html.replace('{property_cards}', '\n'.join(property_cards))
-    html = html.replace('{generated_date}', datetime.now().strftime('%d %b %Y'))
-    
-    with open(os.path.join(output_folder, 'index.html'), 'w', encoding='utf-8') as f:
-        f.write(html)
+    positions = [i for i, listing in enumerate(state['listings']) if listing.prop_id in affected]
+    listings = [state['listings'][i] for i in positions]
+    if listings:
+        state['listing_photos'].update(process_photos(listings, output_folder))
+        with timed_stage('cards'):
+            for i, card in zip(positions, generate_cards(listings, state['listing_photos'], output_folder)):
+                state['cards'][i] = card
+    
+    available_rows = {id(listing) for listing in state['available']}
+    available = [listing for listing in listings if id(listing) in available_rows]
+    detail_pages = build_detail_pages(available, state['listing_photos'], output_folder, partial=True) if available else []
+    index_pages = build_index_pages(state['listings'], state['cards'], state['listing_photos'], state['stats'], output_folder)
+    finish_text_outputs(output_folder, index_pages + detail_pages, partial=True)
+    save_build_report(output_folder)
+    return state, affected
+
+
+def watch_website():
+    """Build once, then rebuild the affected listings whenever a source changes.
+
+    Sources are polled every WATCH_INTERVAL seconds. If watchdog is installed,
+    file events wake the loop early. A change is only acted on once the
+    sources have stayed the same for WATCH_DEBOUNCE seconds.
+    """
+    output_folder = os.path.abspath(OUTPUT_FOLDER)
+    state = build_website(output_folder)
+    snapshot = get_source_snapshot(state['listings'])
+    
+    wake = threading.Event()
+    observer = None
+    if HAS_WATCHDOG:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+        handler = FileSystemEventHandler()
+        handler.on_any_event = lambda event: wake.set()
+        observer = Observer()
+        observer.schedule(handler, os.path.dirname(os.path.abspath(MASTERBOOK_PATH)))
+        observer.schedule(handler, PHOTO_BASE_PATH, recursive=True)
+        observer.start()
+    
+    print("\n" + "=" * 60)
+    print(f"👀 Watching masterbook and property folders ({'file events' if observer else 'polling'}). Ctrl+C to stop.")
+    print("=" * 60)
+    try:
+        while True:
+            wake.wait(WATCH_INTERVAL)
+            wake.clear()
+            current = get_source_snapshot(state['listings'])
+            if current == snapshot:
+                continue
+            while True:
+                time.sleep(WATCH_DEBOUNCE)
+                settled = get_source_snapshot(state['listings'])
+                if settled == current:
+                    break
+                current = settled
+            
+            changed = {key for key in current.keys() | snapshot.keys() if current.get(key) != snapshot.get(key)}
+            print(f"\n🔄 Changed: {', '.join(sorted(changed))}")
+            start = time.perf_counter()
+            try:
+                state, affected = rebuild_website(state, changed, output_folder)
+            except Exception as e:
+                # The snapshot is not advanced, so the change is retried on the next check
+                print(f"\n❌ ERROR: {e}")
+                continue
+            print(f"   ✅ Rebuilt {len(affected)} listings + index in {time.perf_counter() - start:.1f}s")
+            snapshot = get_source_snapshot(state['listings'])
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        if observer:
+            observer.stop()
+            observer.join()
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def check_build_requirements():
+    """Print why a build cannot run, or return True"""
+    if not os.path.exists(MASTERBOOK_PATH):
+        print(f"\n❌ ERROR: Cannot find masterbook at:")
+        print(f"   {MASTERBOOK_PATH}")
+        return False
+    
+    if not HAS_PIL:
+        print("\n⚠️ Installing Pillow for photo compression...")
+        import subprocess
+        subprocess.run(['pip', 'install', 'Pillow', '--break-system-packages'], capture_output=True)
+        print("   Please run the script again.")
+        return False
+    
+    load_pandas()
+    if COMPRESS_PHOTOS:
+        print(f"\n📷 Photo compression: ENABLED")
+        print(f"   Max size: {MAX_PHOTO_WIDTH}x{MAX_PHOTO_HEIGHT}, Quality: {JPEG_QUALITY}%")
+    return True
+
+
+def run_profiled(func, output_folder, *args):
+    """Run func(output_folder, *args) under cProfile and dump the stats to PROFILE_FILE"""
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, output_folder, *args)
+    finally:
+        profile_path = os.path.join(output_folder, BUILD_CACHE_FOLDER, PROFILE_FILE)
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        profiler.dump_stats(profile_path)
+        print(f"\n🔬 Profile: {profile_path}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+
+def generate_website(watch=False, profile=False, sweep=False):
+    print("=" * 60)
+    print("ADELYN WONG WEBSITE GENERATOR v4")
+    print("WITH PROPERTY DETAIL PAGES + SEO FROM seo.docx")
+    print("=" * 60)
+    
+    if not check_build_requirements():
+        input("\nPress Enter to exit...")
+        return
+    
+    if watch:
+        watch_website()
+        return
+    
+    output_folder = os.path.abspath(OUTPUT_FOLDER)
+    try:
+        if profile:
+            state = run_profiled(build_website, output_folder, sweep)
+        else:
+            state = build_website(output_folder, sweep)
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        input("\nPress Enter to exit...")
+        return
     
     print(f"\n✅ SUCCESS!")
     print(f"   📄 index.html")
-    print(f"   📄 {detail_count} property pages (PROP-XXXXX.html)")
+    print(f"   📄 {len(state['available'])} property pages (PROP-XXXXX.html)")
     print(f"   📷 photos/ folder (compressed to ~{JPEG_QUALITY}% quality)")
     print("\n" + "=" * 60)
     print("Next: Run Upload_To_GitHub.bat")
@@ -1056,5 +3166,33 @@ def generate_website():
     input("\nPress Enter to exit...")
 
 
+def check_setup():
+    """Report whether the configured paths and optional libraries are usable (no build)"""
+    print("=" * 60)
+    print("ADELYN WONG WEBSITE GENERATOR v4 - CHECK")
+    print("=" * 60)
+    ok = True
+    for label, path in (("Masterbook", MASTERBOOK_PATH), ("Photos", PHOTO_BASE_PATH), ("Output", OUTPUT_FOLDER)):
+        found = os.path.exists(path)
+        ok = ok and found
+        print(f"   {'✅' if found else '❌'} {label}: {path}")
+    print(f"   {'✅' if importlib.util.find_spec('pandas') else '❌'} pandas")
+    ok = ok and importlib.util.find_spec('pandas') is not None
+    print(f"   ✅ Excel engine: {get_masterbook_engine()}")
+    print(f"   {'✅' if HAS_PIL else '⚠️'} Pillow (photo compression)")
+    print(f"   {'✅' if HAS_DOCX else '⚠️'} python-docx (fallback seo.docx reader)")
+    print(f"   {'✅' if HAS_BROTLI else '⚠️'} brotli (.br files)")
+    print(f"   {'✅' if HAS_WATCHDOG else '⚠️'} watchdog (--watch uses polling without it)")
+    return ok
+
+
 if __name__ == "__main__":
-    generate_website()
+    parser = argparse.ArgumentParser(description="Generate the Adelyn Wong property website")
+    parser.add_argument('--check', action='store_true', help="check paths and libraries, then exit")
+    parser.add_argument('--watch', action='store_true', help="keep running and rebuild changed listings")
+    parser.add_argument('--profile', action='store_true', help=f"save a cProfile dump of the build as {PROFILE_FILE}")
+    parser.add_argument('--sweep', action='store_true', help="delete stale pages, photos and assets (default: only list them)")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check_setup() else 1)
+    generate_website(watch=args.watch, profile=args.profile, sweep=args.sweep)